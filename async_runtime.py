@@ -0,0 +1,417 @@
+import asyncio
+import os
+import signal
+import time
+from collections import deque
+from types import MappingProxyType
+
+if os.name == 'posix':
+    import tty
+
+from rich.live import Live
+
+from display import console, GameView
+from commit_events import CommitEvents
+from git_tracker import COMMIT_INFO_FIELDS, HEAD_FIELDS, GitState, RefFingerprint, with_repos
+from git_reader import find_git_dir
+from menu_system import Menu
+from settings import (ANIMATION_INTERVAL, ACTION_DURATION, DECAY_CHECK_INTERVAL, EXIT_AFTER_FIRST_FRAME,
+                      GAME_KEYS, INPUT_BACKLOG, PUSHED_POLL_INTERVAL)
+from terminal_input import ESCAPE_TIMEOUT, KeyParser
+
+# Optional asyncio runtime for Game (uv run game.py --async). Input, git
+# polling, animation, message expiry, autosave and drawing are separate tasks
+# on one event loop; game rules still go through Game.apply_key/handle_command.
+
+# Longest a single git command may run
+GIT_TIMEOUT = 5.0
+
+
+class AsyncGitPoller:
+    """
+    GitPoller for the event loop: git runs through asyncio subprocesses and
+    results are published as a GitState. A refresh requested while one is
+    running is folded into a single follow-up fetch.
+    """
+
+    def __init__(self, interval=5.0, graph_lines=6, max_age=60.0, timeout=GIT_TIMEOUT, repos=None):
+        self.interval = interval
+        self.graph_lines = graph_lines
+        self.max_age = max_age
+        self.timeout = timeout
+        self.repos = repos     # MultiRepoTracker, polled on a worker thread
+        self.on_update = None  # called with the new GitState
+        self._graph = False
+        self._state = GitState()
+        self._wake = asyncio.Event()
+        git_dir = find_git_dir()
+        self._fingerprint = RefFingerprint(git_dir) if git_dir else None
+        self._fetched = None   # (signature, graph, monotonic time) of the last fetch
+        self._info = None      # what that fetch returned
+
+    def latest(self):
+        return self._state
+
+    def request_refresh(self, graph=None):
+        if graph is not None:
+            self._graph = graph
+        self._publish(refreshing=True)
+        self._wake.set()
+
+    def stop(self):
+        # The task is cancelled by AsyncGame; nothing to join
+        pass
+
+    def _publish(self, **changes):
+        new_state = self._state._replace(**changes)
+        if new_state == self._state:
+            return
+        self._state = new_state
+        if self.on_update:
+            self.on_update(new_state)
+
+    async def _git(self, *args):
+        # stdout of a git command, or None if it failed or timed out
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                'git', *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL)
+        except OSError:
+            return None
+        try:
+            stdout, _ = await asyncio.wait_for(proc.communicate(), self.timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            return None
+        except asyncio.CancelledError:
+            proc.kill()
+            raise
+        if proc.returncode != 0:
+            return None
+        return stdout.decode('utf-8', errors='replace')
+
+    async def fetch(self, graph=False):
+        # Same git_info dict as GitSnapshot.get(), with the git commands run concurrently
+        fmt = '%x00'.join(HEAD_FIELDS[name] for name in COMMIT_INFO_FIELDS)
+        commands = [
+            self._git('log', '-1', f'--format={fmt}'),
+            self._git('rev-list', '--count', 'HEAD'),
+        ]
+        if graph:
+            commands.append(self._git('log', '--graph', '--oneline', '--all',
+                                      f'--max-count={self.graph_lines}', '--color=never'))
+        head, total, *rest = await asyncio.gather(*commands)
+
+        info = {}
+        values = head.rstrip('\n').split('\0') if head else []
+        if len(values) == len(COMMIT_INFO_FIELDS):
+            info = {name: value.strip() for name, value in zip(COMMIT_INFO_FIELDS, values)}
+        try:
+            info['total'] = int(total.strip())
+        except (AttributeError, ValueError):
+            info['total'] = 0
+        if graph:
+            info['graph'] = rest[0].strip() if rest[0] and rest[0].strip() else None
+        return info
+
+    def _is_fresh(self, graph):
+        # True if refs haven't moved since the last fetch of this view
+        if self._fetched is None or self._fingerprint is None:
+            return False
+        signature, fetched_graph, fetched_at = self._fetched
+        return (fetched_graph == graph and signature == self._fingerprint.current()
+                and time.monotonic() - fetched_at < self.max_age)
+
+    async def run(self):
+        while True:
+            self._wake.clear()
+            graph = self._graph
+            if self._is_fresh(graph) and self.repos is None:
+                self._publish(refreshing=False)
+            else:
+                if not self._is_fresh(graph):
+                    signature = self._fingerprint.current() if self._fingerprint else None
+                    self._info = await self.fetch(graph)
+                    self._fetched = (signature, graph, time.monotonic())
+                info = self._info
+                if self.repos is not None:
+                    info = await asyncio.to_thread(with_repos, info, self.repos)
+                if self._state.info is not None and self._state.info == info:
+                    self._publish(refreshing=False)
+                else:
+                    self._publish(info=MappingProxyType(info), fetched_at=time.time(), refreshing=False)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+
+
+class AsyncGame:
+    """Runs a Game on an asyncio event loop instead of Game.run()."""
+
+    def __init__(self, game):
+        self.game = game
+        self.menu = Menu()
+        self.view = GameView(self.menu)
+        self.frame_index = 0
+        self.current_action = None
+        self.action_timer = 0
+        self.git = None
+        self.parser = KeyParser()
+        self._keys = None
+        self._overflow = deque()   # parsed keys that didn't fit in the queue
+        self._reading = False
+        self._eof = False
+        self._escape_flush = None
+        self._dirty = None
+        self._animation_changed = None
+        self._message_changed = None
+        self._commit_seen = None
+        self._stopped = None
+        self._commit_events = None
+
+    # --- helpers ---
+
+    def request_render(self):
+        self._dirty.set()
+
+    def _poke(self):
+        # A message or action may have started: wake the animation and expiry tasks
+        self._animation_changed.set()
+        self._message_changed.set()
+        self._dirty.set()
+
+    def _animating(self, now):
+        return now < self.game.message_timer or self.current_action is not None
+
+    def _render(self, live):
+        game = self.game
+        game._sample_history(time.time())
+        msg = game.message if time.time() < game.message_timer else ""
+        git_state = self.git.latest()
+        git_info = git_state.info if game.view_mode in ("git", "git_graph") else None
+        live.update(
+            self.view.update(game.pet, self.menu, msg, self.frame_index, self.current_action,
+                             game.view_mode, git_info, git_refreshing=git_state.refreshing,
+                             history=game.history),
+            refresh=True
+        )
+
+    # --- stdin ---
+
+    def _start_reading(self):
+        if not self._reading and not self._eof:
+            asyncio.get_running_loop().add_reader(self.game.fd, self._on_stdin)
+            self._reading = True
+
+    def _stop_reading(self):
+        if self._reading:
+            asyncio.get_running_loop().remove_reader(self.game.fd)
+            self._reading = False
+
+    def _on_stdin(self):
+        try:
+            data = os.read(self.game.fd, 1024)
+        except OSError:
+            data = b''
+        if not data:
+            # stdin closed
+            self._stop_reading()
+            self._eof = True
+            return
+        self._queue_keys(self.parser.feed(data))
+        if self._escape_flush:
+            self._escape_flush.cancel()
+            self._escape_flush = None
+        if self.parser.pending:
+            self._escape_flush = asyncio.get_running_loop().call_later(
+                ESCAPE_TIMEOUT, lambda: self._queue_keys(self.parser.flush()))
+
+    def _queue_keys(self, keys):
+        self._overflow.extend(key for key in keys if key in GAME_KEYS)
+        self._fill_queue()
+
+    def _fill_queue(self):
+        # Backpressure: stop reading stdin while the game is INPUT_BACKLOG keys behind;
+        # unread keys wait in the terminal's buffer
+        while self._overflow and not self._keys.full():
+            self._keys.put_nowait(self._overflow.popleft())
+        if self._overflow:
+            self._stop_reading()
+        else:
+            self._start_reading()
+
+    def _on_commit_event(self, event):
+        # Hook event, read on the loop thread: refresh git and re-check the decay now
+        self.game._notice_commit(event)
+        self._commit_seen.set()
+        self._poke()
+
+    # --- tasks ---
+
+    async def _input_task(self):
+        while True:
+            key = await self._keys.get()
+            self._fill_queue()
+            action = self.game.apply_key(self.menu, key)
+            if action:
+                self.current_action = action
+                self.action_timer = time.time() + ACTION_DURATION
+                self.frame_index = 0
+            if not self.game.running:
+                self._stopped.set()
+                return
+            self._poke()
+
+    async def _animation_task(self):
+        while True:
+            if not self._animating(time.time()):
+                self._animation_changed.clear()
+                await self._animation_changed.wait()
+                continue
+            await asyncio.sleep(ANIMATION_INTERVAL)
+            if self.current_action and time.time() > self.action_timer:
+                self.current_action = None
+            self.frame_index = (self.frame_index + 1) % 100
+            self.request_render()
+
+    async def _message_task(self):
+        # Redraw when the message expires, so it disappears on time
+        while True:
+            self._message_changed.clear()
+            remaining = self.game.message_timer - time.time()
+            if remaining <= 0:
+                await self._message_changed.wait()
+                continue
+            try:
+                await asyncio.wait_for(self._message_changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                self.request_render()
+
+    async def _autosave_task(self):
+        # Same debounce as the AutoSaver thread, driven by the event loop instead
+        autosaver = self.game.autosaver
+        while True:
+            await asyncio.sleep(autosaver.interval)
+            if autosaver.dirty:
+                await asyncio.to_thread(autosaver.flush)
+
+    async def _history_task(self):
+        # Sample on schedule even when nothing redraws; redraw if the sparklines moved
+        game = self.game
+        while True:
+            await asyncio.sleep(max(0.0, game._next_sample_at - time.time()))
+            version = game.history.version
+            game._sample_history(time.time())
+            if game.history.version != version:
+                self.request_render()
+
+    async def _decay_task(self):
+        # Re-read the commit activity every DECAY_CHECK_INTERVAL, tick in between
+        game = self.game
+        next_check = 0
+        while True:
+            if time.time() >= next_check or self._commit_seen.is_set():
+                self._commit_seen.clear()
+                await asyncio.to_thread(game._check_decay)
+                next_check = time.time() + DECAY_CHECK_INTERVAL
+                game._apply_pending_decay()
+                self._poke()
+            elif game._advance_decay():
+                self.request_render()
+            try:
+                await asyncio.wait_for(self._commit_seen.wait(),
+                                       max(0.0, min(next_check, game._next_decay_at) - time.time()))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _render_task(self, live):
+        while True:
+            await self._dirty.wait()
+            self._dirty.clear()
+            self._render(live)
+
+    # --- main ---
+
+    async def run(self):
+        game = self.game
+        loop = asyncio.get_running_loop()
+        self._keys = asyncio.Queue(maxsize=INPUT_BACKLOG)
+        self._dirty = asyncio.Event()
+        self._animation_changed = asyncio.Event()
+        self._message_changed = asyncio.Event()
+        self._commit_seen = asyncio.Event()
+        self._stopped = asyncio.Event()
+
+        self.git = AsyncGitPoller(interval=5.0, graph_lines=6)
+        self.git.on_update = lambda state: self.request_render()
+        game.git_poller = self.git  # handle_command's refresh requests go here
+
+        game.autosaver.install_exit_hooks()
+        if os.name == 'posix':
+            tty.setcbreak(game.fd)
+            loop.add_signal_handler(signal.SIGWINCH, self.request_render)
+        console.clear()
+
+        tasks = []
+        try:
+            with Live(
+                self.view.update(game.pet, self.menu, game.message, 0, None),
+                auto_refresh=False,
+                console=console,
+                screen=True,
+                refresh_per_second=20
+            ) as live:
+                if EXIT_AFTER_FIRST_FRAME:
+                    return
+                self._start_reading()
+                game._open_history()
+                game._open_repos()
+                self.git.repos = game.repos
+                self._commit_events = CommitEvents(on_event=self._on_commit_event)
+                pushed = False
+                if self._commit_events.open():
+                    loop.add_reader(self._commit_events.sock, self._commit_events.read)
+                    pushed = game._hooks_installed()
+                game.git_watcher = game._open_git_watcher(
+                    on_change=lambda: loop.call_soon_threadsafe(self.git.request_refresh))
+                if pushed or game.git_watcher:
+                    self.git.interval = PUSHED_POLL_INTERVAL
+                tasks = [
+                    asyncio.create_task(self._render_task(live), name="render"),
+                    asyncio.create_task(self._input_task(), name="input"),
+                    asyncio.create_task(self._animation_task(), name="animation"),
+                    asyncio.create_task(self._message_task(), name="message"),
+                    asyncio.create_task(self.git.run(), name="git"),
+                    asyncio.create_task(self._autosave_task(), name="autosave"),
+                    asyncio.create_task(self._decay_task(), name="decay"),
+                ]
+                if game.history is not None:
+                    tasks.append(asyncio.create_task(self._history_task(), name="history"))
+                self._poke()
+                # Runs until quit; a failing task stops the game and its error is raised
+                stopped = asyncio.create_task(self._stopped.wait(), name="stopped")
+                pending = set(tasks) | {stopped}
+                while not stopped.done():
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        if task is not stopped and task.exception():
+                            stopped.cancel()
+                            raise task.exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self._escape_flush:
+                self._escape_flush.cancel()
+            self._stop_reading()
+            if self._commit_events and self._commit_events.listening:
+                loop.remove_reader(self._commit_events.sock)
+                self._commit_events.close()
+            if os.name == 'posix':
+                loop.remove_signal_handler(signal.SIGWINCH)
+            game.cleanup()
+
+
+def run_async(game):
+    asyncio.run(AsyncGame(game).run())
@@ -0,0 +1,110 @@
+import atexit
+import signal
+import threading
+import time
+
+from save_system import save_pet
+
+# Fewest seconds between two autosaves
+AUTOSAVE_INTERVAL = 2.0
+
+
+class AutoSaver:
+    """
+    Saves the pet on a background thread once something marked it dirty,
+    at most once every `interval` seconds, so a burst of changes becomes a
+    single write. flush() saves right away; stop() and the exit hooks
+    flush whatever is still pending.
+    """
+
+    def __init__(self, pet, interval=AUTOSAVE_INTERVAL, save=save_pet):
+        self.pet = pet
+        self.interval = interval
+        self.save = save
+        self.saves = 0
+        self._cond = threading.Condition()
+        self._save_lock = threading.Lock()   # one write at a time, whichever thread flushes
+        self._events = []                    # what changed since the last save
+        self._dirty = False
+        self._last_save = 0.0
+        self._stopping = False
+        self._thread = None
+
+    @property
+    def dirty(self):
+        return self._dirty
+
+    def mark_dirty(self, event=None):
+        # Safe to call from any thread
+        with self._cond:
+            self._dirty = True
+            if event and event not in self._events:
+                self._events.append(event)
+            self._cond.notify()
+
+    def flush(self, event=None):
+        # Save now if anything changed (or always, when event is given); True if a save happened
+        with self._save_lock:
+            with self._cond:
+                if event and event not in self._events:
+                    self._events.append(event)
+                if not self._dirty and not event:
+                    return False
+                events, self._events = self._events, []
+                self._dirty = False
+            ok = self.save(self.pet, event=",".join(events) or None)
+            self._last_save = time.monotonic()
+            self.saves += 1
+            if ok is False:
+                # Keep the changes pending so the next flush retries them
+                with self._cond:
+                    self._dirty = True
+                    self._events[:0] = [e for e in events if e not in self._events]
+            return True
+
+    def start(self):
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=2.0):
+        # Stop the worker and write anything still pending
+        with self._cond:
+            self._stopping = True
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def install_exit_hooks(self):
+        # Final flush at interpreter exit, and turn SIGTERM/SIGHUP into a normal
+        # exit so cleanup code runs. Call from the main thread.
+        atexit.register(self.flush)
+        for name in ('SIGTERM', 'SIGHUP'):
+            signum = getattr(signal, name, None)
+            if signum is not None and signal.getsignal(signum) in (signal.SIG_DFL, None):
+                signal.signal(signum, _exit_on_signal)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._dirty and not self._stopping:
+                    self._cond.wait()
+                if self._stopping:
+                    return
+                # Let the burst settle: no more than one save per interval
+                wait = self._last_save + self.interval - time.monotonic()
+                if wait > 0:
+                    self._cond.wait_for(lambda: self._stopping, wait)
+                    if self._stopping:
+                        return
+            try:
+                self.flush()
+            except Exception:
+                pass
+
+
+def _exit_on_signal(signum, frame):
+    raise SystemExit(128 + signum)
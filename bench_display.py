@@ -0,0 +1,55 @@
+import io
+import sys
+import tracemalloc
+
+from rich.console import Console
+
+from display import GameView, create_game_layout
+from menu_system import Menu
+from pet_system.pet_data import Pet
+
+# Allocations per frame: rebuilding the layout every frame vs. the retained GameView.
+#   uv run bench_display.py [frames]
+
+FRAMES = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+# Don't count the snapshots themselves
+FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+pet = Pet()
+menu = Menu()
+console = Console(width=120, height=50, file=io.StringIO(), force_terminal=True)
+
+
+def frame_args(i):
+    # Animate the sprite and move through the menu like a user would
+    if i % 20 == 0:
+        menu.navigate_down()
+    return (pet, menu, "🎵 Singing!" if i % 40 < 20 else "", i, "sing" if i % 40 < 20 else None)
+
+
+def measure(label, build):
+    build(*frame_args(0))  # warm caches and imports outside the measurement
+    tracemalloc.start()
+    blocks = size = peak = 0
+    for i in range(FRAMES):
+        before = tracemalloc.take_snapshot().filter_traces(FILTERS)
+        layout = build(*frame_args(i))
+        diff = tracemalloc.take_snapshot().filter_traces(FILTERS).compare_to(before, 'filename')
+        blocks += sum(stat.count_diff for stat in diff if stat.count_diff > 0)
+        size += sum(stat.size_diff for stat in diff if stat.size_diff > 0)
+
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        console.print(layout)
+        console.file.seek(0)
+        console.file.truncate()
+        peak += tracemalloc.get_traced_memory()[1] - base
+        del layout
+    tracemalloc.stop()
+    print(f"{label:<20} build {blocks / FRAMES:8.1f} blocks {size / FRAMES / 1024:8.1f} KiB"
+          f"   render peak {peak / FRAMES / 1024:8.1f} KiB")
+
+
+print(f"🖼️  {FRAMES} frames, width {console.width}\n")
+measure("create_game_layout", create_game_layout)
+measure("GameView", GameView(menu).update)
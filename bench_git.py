@@ -0,0 +1,49 @@
+import subprocess
+import sys
+import timeit
+
+from git_reader import find_git_dir
+from git_tracker import (
+    COMMIT_INFO_FIELDS,
+    _head_from_batch,
+    _head_from_cli,
+    _head_from_reader,
+    close_cat_file,
+    is_git_repo,
+)
+
+# Pure-Python .git reader and the persistent cat-file process vs. forking git.
+# Run from inside a git repo:
+#   uv run bench_git.py [iterations]
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+
+def cli_is_git_repo():
+    try:
+        subprocess.run(['git', 'rev-parse', '--git-dir'], capture_output=True, check=True)
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return False
+
+
+def bench(label, fast_fn, cli_fn, backend="reader"):
+    fast = timeit.timeit(fast_fn, number=ITERATIONS) / ITERATIONS
+    cli = timeit.timeit(cli_fn, number=ITERATIONS) / ITERATIONS
+    print(f"{label:<22} {backend:<8} {fast * 1e6:9.1f} µs   git {cli * 1e6:9.1f} µs   {cli / fast:6.1f}x")
+
+
+if not is_git_repo():
+    print("❌ Not a git repository")
+    sys.exit(1)
+
+if _head_from_reader(COMMIT_INFO_FIELDS) != _head_from_cli(COMMIT_INFO_FIELDS):
+    print("⚠️  Reader and git disagree on HEAD commit info")
+
+print(f"⏱️  {ITERATIONS} iterations each\n")
+bench("is_git_repo", lambda: find_git_dir() is not None, cli_is_git_repo)
+bench("last commit time", lambda: _head_from_reader(('timestamp',)), lambda: _head_from_cli(('timestamp',)))
+bench("commit info", lambda: _head_from_reader(COMMIT_INFO_FIELDS), lambda: _head_from_cli(COMMIT_INFO_FIELDS))
+_head_from_batch(COMMIT_INFO_FIELDS)  # start the process outside the timing
+bench("commit info", lambda: _head_from_batch(COMMIT_INFO_FIELDS), lambda: _head_from_cli(COMMIT_INFO_FIELDS), "cat-file")
+close_cat_file()
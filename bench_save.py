@@ -0,0 +1,47 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from pet_system.pet_data import Pet, HISTORY_LIMIT
+from save_system import SaveStore, pet_save_data
+
+# Snapshot store/load time for JSON vs. binary saves as the interaction history grows.
+#   uv run bench_save.py [repeats]
+
+REPEATS = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+HISTORY_SIZES = (0, 1000, HISTORY_LIMIT)
+
+
+def make_pet(history):
+    pet = Pet(owner_name="Bench", pet_name="Quackers")
+    start = time.time() - history * 60
+    pet.interaction_times = [start + i * 60.5 for i in range(history)]
+    return pet
+
+
+def best_of(fn):
+    best = float('inf')
+    for _ in range(REPEATS):
+        t = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t)
+    return best * 1000
+
+
+workdir = tempfile.mkdtemp(prefix='devgotchi-bench-')
+try:
+    print(f"💾 best of {REPEATS}, snapshot write (fsync included) and single-read load\n")
+    print(f"{'history':>8}  {'format':<7} {'size':>9}  {'store':>9}  {'load':>9}")
+    for history in HISTORY_SIZES:
+        pet = make_pet(history)
+        for fmt in ("json", "binary"):
+            path = os.path.join(workdir, f"save.{fmt}")
+            store = SaveStore(path=path, journal_path=os.path.join(workdir, f"save.{fmt}.journal"), format=fmt)
+            store_ms = best_of(lambda: store.compact(pet_save_data(pet)))
+            load_ms = best_of(lambda: SaveStore(path=path, journal_path=store.journal_path, format=fmt).load())
+            size = os.path.getsize(path)
+            print(f"{history:>8}  {fmt:<7} {size / 1024:7.1f}KB  {store_ms:7.2f}ms  {load_ms:7.2f}ms")
+finally:
+    shutil.rmtree(workdir)
@@ -0,0 +1,93 @@
+import os
+import pty
+import select
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Startup cost: the slowest imports behind `import game`, and wall-clock time
+# from launch until the first frame has been drawn.
+#   uv run bench_startup.py [runs]
+
+RUNS = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+HERE = os.path.dirname(os.path.abspath(__file__))
+TOP_IMPORTS = 12
+
+
+def import_times(module):
+    # (cumulative µs, self µs, name) for every import made by `import module`
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, cwd=HERE)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative), int(own), name.rstrip()))
+    return rows
+
+
+# Panel title; the whole frame is written in one go, so seeing it means the frame is drawn
+FRAME_MARKER = b'DevGotchi'
+
+
+def time_to_first_frame(workdir):
+    # Run the game in a pty (it needs a terminal) until it exits after the first frame
+    env = dict(os.environ, DEVGOTCHI_EXIT_AFTER_FIRST_FRAME='1', PYTHONPATH=HERE)
+    pid, fd = pty.fork()
+    if pid == 0:
+        os.chdir(workdir)
+        os.execve(sys.executable, [sys.executable, os.path.join(HERE, 'game.py')], env)
+    start = time.perf_counter()
+    first_frame = None
+    output = b''
+    try:
+        while True:
+            ready, _, _ = select.select([fd], [], [], 10)
+            if not ready:
+                raise TimeoutError("game.py did not exit")
+            try:
+                data = os.read(fd, 65536)
+            except OSError:
+                break
+            if not data:
+                break
+            if first_frame is None:
+                output += data
+                if FRAME_MARKER in output:
+                    first_frame = time.perf_counter()
+    finally:
+        os.close(fd)
+        os.waitpid(pid, 0)
+    if first_frame is None:
+        raise RuntimeError("game.py exited without drawing a frame")
+    return first_frame - start, time.perf_counter() - start
+
+
+rows = import_times('game')
+total = max(rows)[0] if rows else 0
+print(f"📦 import game: {total / 1000:.1f} ms\n")
+for cumulative, own, name in sorted(rows, reverse=True)[:TOP_IMPORTS]:
+    print(f"  {cumulative / 1000:7.1f} ms  (self {own / 1000:6.1f} ms)  {name}")
+
+# Run against a throwaway save so no first-time setup prompt appears
+workdir = tempfile.mkdtemp(prefix='devgotchi-bench-')
+try:
+    from pet_system.pet_data import Pet
+    from save_system import save_pet
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        save_pet(Pet())
+    finally:
+        os.chdir(cwd)
+
+    first, total = zip(*(time_to_first_frame(workdir) for _ in range(RUNS)))
+    print(f"\n🖼️  first frame over {RUNS} runs")
+    print(f"  first frame    min {min(first) * 1000:7.1f} ms   median {statistics.median(first) * 1000:7.1f} ms")
+    print(f"  frame + exit   min {min(total) * 1000:7.1f} ms   median {statistics.median(total) * 1000:7.1f} ms")
+finally:
+    shutil.rmtree(workdir)
@@ -0,0 +1,60 @@
+import sys
+import time
+
+import numpy as np
+
+from pet_system.pet_data import BOND_LEVEL, NAME_CLARITY
+from pet_system.team_sim import COMMIT, FEED, PLAY, TeamSim, make_timeline, simulate_scalar, stat_matrix
+
+# Team simulation throughput (pet-hours simulated per second), vectorized vs.
+# one Pet at a time, and a check that both end with the same stats.
+#   uv run --with numpy bench_team_sim.py [pets] [days]
+
+PETS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+DAYS = int(sys.argv[2]) if len(sys.argv) > 2 else 180
+SCALAR_PETS = min(PETS, 50)   # the per-Pet replay is slow; check it on the first few
+STEP = 3600.0
+START = 1_700_000_000.0
+
+
+def random_timeline(pets, days, seed=0):
+    # Each dev commits on some days (a few commits on those) and feeds/plays now and then
+    rng = np.random.default_rng(seed)
+    commit_rate = rng.uniform(0.1, 0.9, pets)           # chance of committing on a given day
+    events = []
+    for day in range(days):
+        committing = np.flatnonzero(rng.random(pets) < commit_rate)
+        counts = rng.integers(1, 5, committing.size)
+        who = np.repeat(committing, counts)
+        events.append((START + day * 86400 + rng.uniform(0, 86400, who.size), who, np.full(who.size, COMMIT)))
+        playing = np.flatnonzero(rng.random(pets) < 0.3)
+        kinds = rng.choice([FEED, PLAY], playing.size)
+        events.append((START + day * 86400 + rng.uniform(0, 86400, playing.size), playing, kinds))
+    times, who, kinds = (np.concatenate(parts) for parts in zip(*events))
+    return make_timeline(times, who, kinds)
+
+
+timeline = random_timeline(PETS, DAYS)
+end = START + DAYS * 86400
+pet_hours = PETS * DAYS * 24
+print(f"👥 {PETS} pets, {DAYS} days, {len(timeline.times)} events, {STEP / 3600:g}h steps\n")
+
+t = time.perf_counter()
+sim = TeamSim(PETS, START)
+sim.run(timeline, end, step=STEP)
+vector_s = time.perf_counter() - t
+print(f"vectorized  {vector_s * 1000:9.1f}ms  {pet_hours / vector_s:14,.0f} pet-hours/s")
+
+subset = timeline.pets < SCALAR_PETS
+small = make_timeline(timeline.times[subset], timeline.pets[subset], timeline.kinds[subset])
+t = time.perf_counter()
+pets = simulate_scalar(SCALAR_PETS, small, START, end, step=STEP)
+scalar_s = time.perf_counter() - t
+print(f"per-Pet     {scalar_s * 1000:9.1f}ms  {SCALAR_PETS * DAYS * 24 / scalar_s:14,.0f} pet-hours/s"
+      f"  ({SCALAR_PETS} pets)")
+
+same = (np.array_equal(stat_matrix(pets), sim.values[:SCALAR_PETS])
+        and np.array_equal([pet.last_interaction for pet in pets], sim.last_interaction[:SCALAR_PETS]))
+print(f"\nstats identical for the first {SCALAR_PETS} pets: {same}")
+print(f"mean bond {sim.values[:, BOND_LEVEL].mean():.1f}, mean memory {sim.values[:, NAME_CLARITY].mean():.1f}, "
+      f"pets fully forgotten {int((sim.values[:, NAME_CLARITY] == 0).sum())}")
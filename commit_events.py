@@ -0,0 +1,276 @@
+import getpass
+import json
+import os
+import selectors
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Push notifications from git: installed post-commit/post-merge hooks send a
+# small JSON datagram to a Unix socket owned by the running game, which then
+# refreshes right away instead of waiting for the next poll.
+#   python commit_events.py install [repo ...]     (default: the current repo)
+#   python commit_events.py uninstall [repo ...]
+
+# Override where the game listens (and where hooks send)
+SOCKET_ENV = "DEVGOTCHI_SOCKET"
+HOOKS = ("post-commit", "post-merge")
+# First line after the shebang; marks hooks written by install_hooks()
+HOOK_MARKER = "# devgotchi-hook"
+# An existing hook is kept under this suffix and run first
+CHAINED_SUFFIX = ".devgotchi-chained"
+# Largest event accepted
+MAX_EVENT = 4096
+
+HOOK_SCRIPT = """#!/bin/sh
+{marker}: tells a running DevGotchi about the {hook} (python commit_events.py uninstall removes it)
+status=0
+if [ -x "$0{suffix}" ]; then
+    "$0{suffix}" "$@"
+    status=$?
+fi
+"{python}" "{module}" notify {hook} >/dev/null 2>&1
+exit $status
+"""
+
+
+def socket_path():
+    # Per-user socket: DEVGOTCHI_SOCKET, else $XDG_RUNTIME_DIR, else the temp dir
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        return os.path.join(runtime_dir, "devgotchi.sock")
+    return os.path.join(tempfile.gettempdir(), f"devgotchi-{getpass.getuser()}.sock")
+
+
+def notify(hook, repo=None, path=None):
+    # Send one event to the game; False if nobody is listening
+    event = {"event": hook, "repo": os.path.abspath(repo or os.getcwd()), "time": time.time()}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as sock:
+            sock.sendto(json.dumps(event).encode("utf-8"), path or socket_path())
+        return True
+    except OSError:
+        return False
+
+
+# --- hooks ---
+
+def hooks_dir(repo=None):
+    # The directory git runs hooks from, honouring core.hooksPath; None outside a repo
+    from git_reader import find_git_dir, get_common_dir
+    git_dir = find_git_dir(repo)
+    if git_dir is None:
+        return None
+    cwd = os.path.abspath(repo or os.getcwd())
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--git-path', 'hooks'], capture_output=True,
+                                text=True, check=True, cwd=cwd, timeout=5)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
+        # No usable git: hooks won't run anyway, but keep install/uninstall symmetric
+        return os.path.join(get_common_dir(git_dir), "hooks")
+    # Relative to cwd, like every --git-path
+    return os.path.normpath(os.path.join(cwd, result.stdout.strip()))
+
+
+def _is_ours(path):
+    try:
+        with open(path, "r", errors="replace") as f:
+            f.readline()
+            return f.readline().startswith(HOOK_MARKER)
+    except OSError:
+        return False
+
+
+def hooks_installed(repo=None):
+    directory = hooks_dir(repo)
+    return directory is not None and all(_is_ours(os.path.join(directory, hook)) for hook in HOOKS)
+
+
+def install_hooks(repo=None):
+    # Write our hooks into the repo; existing ones are renamed and chained. Returns the hooks dir.
+    directory = hooks_dir(repo)
+    if directory is None:
+        raise ValueError(f"Not a git repository: {repo or os.getcwd()}")
+    os.makedirs(directory, exist_ok=True)
+    module = os.path.abspath(__file__)
+    for hook in HOOKS:
+        path = os.path.join(directory, hook)
+        if os.path.exists(path) and not _is_ours(path):
+            os.replace(path, path + CHAINED_SUFFIX)
+        script = HOOK_SCRIPT.format(marker=HOOK_MARKER, hook=hook, suffix=CHAINED_SUFFIX,
+                                    python=sys.executable, module=module)
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            f.write(script)
+        os.chmod(tmp, 0o755)
+        os.replace(tmp, path)
+    return directory
+
+
+def uninstall_hooks(repo=None):
+    # Remove our hooks and put back the ones they chained
+    directory = hooks_dir(repo)
+    if directory is None:
+        return False
+    removed = False
+    for hook in HOOKS:
+        path = os.path.join(directory, hook)
+        if _is_ours(path):
+            os.remove(path)
+            removed = True
+            if os.path.exists(path + CHAINED_SUFFIX):
+                os.replace(path + CHAINED_SUFFIX, path)
+    return removed
+
+
+# --- listener ---
+
+class CommitEvents:
+    """
+    Receives hook events on a Unix datagram socket and passes each one
+    (a dict with "event", "repo" and "time") to on_event. open() and
+    read() are for event loops; start()/stop() run it on a thread.
+    Only one game per user can listen; open() returns False for the others.
+    """
+
+    def __init__(self, on_event, path=None):
+        self.on_event = on_event
+        self.path = path or socket_path()
+        self.sock = None
+        self._thread = None
+        self._wakeup = None
+
+    @property
+    def listening(self):
+        return self.sock is not None
+
+    def open(self):
+        if self.sock is not None:
+            return True
+        if not hasattr(socket, "AF_UNIX"):
+            return False
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        except OSError:
+            return False  # no Unix datagram sockets here (Windows)
+        try:
+            self._bind(sock)
+        except OSError:
+            sock.close()
+            return False
+        sock.setblocking(False)
+        self.sock = sock
+        return True
+
+    def _bind(self, sock):
+        try:
+            sock.bind(self.path)
+        except OSError:
+            # A socket file left by a game that didn't exit cleanly is replaced;
+            # a live one (or somebody else's file) is left alone
+            st = os.lstat(self.path)
+            if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid() or self._alive():
+                raise
+            os.remove(self.path)
+            sock.bind(self.path)
+        os.chmod(self.path, 0o600)
+
+    def _alive(self):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as probe:
+            try:
+                probe.connect(self.path)
+            except OSError:
+                return False
+        return True
+
+    def read(self):
+        # Handle every queued event without blocking
+        while True:
+            try:
+                data = self.sock.recv(MAX_EVENT)
+            except OSError:
+                # Nothing left (BlockingIOError), or the socket is gone
+                return
+            try:
+                event = json.loads(data)
+            except ValueError:
+                continue
+            if isinstance(event, dict) and isinstance(event.get("event"), str):
+                try:
+                    self.on_event(event)
+                except Exception:
+                    pass
+
+    def close(self):
+        if self.sock is None:
+            return
+        self.sock.close()
+        self.sock = None
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def start(self):
+        # Listen on a background thread; False if the socket couldn't be opened
+        if self._thread is not None:
+            return True
+        if not self.open():
+            return False
+        self._wakeup = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="commit-events", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if self._thread is not None:
+            try:
+                os.write(self._wakeup[1], b'x')
+            except OSError:
+                pass
+            if self._thread is not threading.current_thread():
+                self._thread.join(timeout=1.0)
+            self._thread = None
+            for fd in self._wakeup:
+                os.close(fd)
+            self._wakeup = None
+        self.close()
+
+    def _run(self):
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.sock, selectors.EVENT_READ)
+            selector.register(self._wakeup[0], selectors.EVENT_READ)
+            while True:
+                for key, _ in selector.select():
+                    if key.fd == self._wakeup[0]:
+                        return
+                    self.read()
+
+
+def main(argv):
+    if len(argv) >= 2 and argv[0] == "notify":
+        notify(argv[1])
+        return 0
+    if argv and argv[0] in ("install", "uninstall"):
+        for repo in argv[1:] or [None]:
+            if argv[0] == "install":
+                try:
+                    print(f"Installed {', '.join(HOOKS)} in {install_hooks(repo)}")
+                except ValueError as e:
+                    print(e)
+                    return 1
+            elif uninstall_hooks(repo):
+                print(f"Removed DevGotchi hooks from {hooks_dir(repo)}")
+        return 0
+    print("usage: python commit_events.py install|uninstall [repo ...]")
+    return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,234 @@
+import hashlib
+import os
+import struct
+import subprocess
+import threading
+import time
+from array import array
+from datetime import date, datetime, timedelta
+
+from git_reader import GitObjectError, find_git_dir, get_common_dir, open_repository
+from save_system import SAVE_FILE
+
+# Persistent (sha, commit time) index of every commit reachable from HEAD, so
+# streaks and gaps don't need a full `git log` on big repos.
+#
+# File layout: a fixed header, then one 28-byte record per commit.
+# New commits are appended and only then is the header's count bumped, so a
+# torn append is simply ignored on the next load.
+
+INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(SAVE_FILE)), "commit_index.bin")
+
+MAGIC = b'DGCI'
+VERSION = 1
+HEADER = struct.Struct('<4sHHI20s20s')   # magic, version, reserved, count, tip sha, repo id
+RECORD = struct.Struct('<q20s')          # commit timestamp, sha
+NO_TIP = b'\0' * 20
+
+
+def _repo_id(git_dir):
+    return hashlib.sha1(os.path.realpath(get_common_dir(git_dir)).encode('utf-8')).digest()
+
+
+class CommitIndex:
+    """
+    Commit timestamps for HEAD's history, kept in compact arrays and on disk.
+    The file is read once; later update() calls only ask git what's new.
+    update() may be called from several threads.
+    """
+
+    def __init__(self, path=INDEX_FILE, repo_path=None):
+        self.path = path
+        self.repo_path = repo_path
+        self.timestamps = array('q')
+        self.shas = bytearray()   # 20 bytes per commit, same order as timestamps
+        self.tip = None
+        self._repo_id = None
+        self._loaded = False
+        self._days = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    # --- storage ---
+
+    def _load(self):
+        self._days = None
+        self.timestamps = array('q')
+        self.shas = bytearray()
+        self.tip = None
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+        if len(data) < HEADER.size:
+            return False
+        magic, version, _, count, tip, repo_id = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION or repo_id != self._repo_id:
+            return False
+        end = HEADER.size + count * RECORD.size
+        if len(data) < end:
+            return False
+        for timestamp, sha in RECORD.iter_unpack(data[HEADER.size:end]):
+            self.timestamps.append(timestamp)
+            self.shas += sha
+        self.tip = tip.hex() if tip != NO_TIP else None
+        return True
+
+    def _header(self):
+        tip = bytes.fromhex(self.tip) if self.tip else NO_TIP
+        return HEADER.pack(MAGIC, VERSION, 0, len(self.timestamps), tip, self._repo_id)
+
+    def _rewrite(self):
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(self._header())
+            f.write(b''.join(RECORD.pack(ts, bytes(self.shas[i * 20:i * 20 + 20]))
+                             for i, ts in enumerate(self.timestamps)))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def _append(self, records):
+        self._days = None
+        start = len(self.timestamps)
+        for timestamp, sha in records:
+            self.timestamps.append(timestamp)
+            self.shas += sha
+        with open(self.path, 'r+b') as f:
+            f.seek(HEADER.size + start * RECORD.size)
+            f.write(b''.join(RECORD.pack(ts, sha) for ts, sha in records))
+            f.truncate()
+            f.flush()
+            os.fsync(f.fileno())
+            # Records are durable; now publish them by bumping the header
+            f.seek(0)
+            f.write(self._header())
+
+    # --- git ---
+
+    def _git(self, *args):
+        return subprocess.run(['git', *args], capture_output=True, text=True, cwd=self.repo_path)
+
+    def _rev_list(self, *revs):
+        # (timestamp, sha bytes) oldest first, for commits in the given range
+        result = self._git('rev-list', '--timestamp', '--reverse', *revs)
+        if result.returncode != 0:
+            raise GitObjectError(result.stderr.strip() or "git rev-list failed")
+        records = []
+        for line in result.stdout.splitlines():
+            timestamp, sha = line.split()
+            records.append((int(timestamp), bytes.fromhex(sha)))
+        return records
+
+    def update(self):
+        # Bring the index up to HEAD. Returns the number of commits ingested, or None if not a repo.
+        with self._lock:
+            try:
+                return self._update()
+            except BaseException:
+                # Memory and file may disagree now; re-read the file next time
+                self._repo_id = None
+                raise
+
+    def _update(self):
+        git_dir = find_git_dir(self.repo_path)
+        repo = open_repository(self.repo_path)
+        if git_dir is None or repo is None:
+            return None
+        repo_id = _repo_id(git_dir)
+        if repo_id != self._repo_id:
+            # First update, or the repo moved: start from what's on disk
+            self._repo_id = repo_id
+            self._loaded = self._load()
+        loaded = self._loaded
+
+        head = repo.resolve_head()
+        if head is None:
+            # Unborn branch: nothing to index
+            if self.tip is not None or not loaded:
+                self.timestamps, self.shas, self.tip = array('q'), bytearray(), None
+                self._rewrite()
+                self._loaded = True
+            return 0
+        if loaded and head == self.tip:
+            return 0
+
+        if loaded and self.tip is not None:
+            is_ancestor = self._git('merge-base', '--is-ancestor', self.tip, head).returncode == 0
+            if is_ancestor:
+                records = self._rev_list(head, f'^{self.tip}')
+                self.tip = head
+                self._append(records)
+                return len(records)
+
+        # No index yet, or history was rewritten (rebase, amend, reset): rebuild
+        records = self._rev_list(head)
+        self._days = None
+        self.timestamps, self.shas, self.tip = array('q'), bytearray(), head
+        for timestamp, sha in records:
+            self.timestamps.append(timestamp)
+            self.shas += sha
+        self._rewrite()
+        self._loaded = True
+        return len(records)
+
+    # --- analytics ---
+
+    def last_commit_time(self):
+        return max(self.timestamps) if self.timestamps else None
+
+    def hours_since_last_commit(self, now=None):
+        last = self.last_commit_time()
+        if last is None:
+            return 0.0
+        now = time.time() if now is None else now
+        return max(0, (now - last) / 3600)
+
+    def commit_days(self):
+        # Local dates with at least one commit, sorted
+        if self._days is None:
+            self._days = sorted({date.fromtimestamp(ts) for ts in self.timestamps})
+        return self._days
+
+    def commits_per_day(self):
+        counts = {}
+        for ts in self.timestamps:
+            day = date.fromtimestamp(ts)
+            counts[day] = counts.get(day, 0) + 1
+        return counts
+
+    def current_streak(self, today=None):
+        # Consecutive days with commits, ending today (or yesterday, if today has none yet)
+        days = set(self.commit_days())
+        day = today or date.today()
+        if day not in days:
+            day -= timedelta(days=1)
+        streak = 0
+        while day in days:
+            streak += 1
+            day -= timedelta(days=1)
+        return streak
+
+    def longest_streak(self):
+        best = run = 0
+        previous = None
+        for day in self.commit_days():
+            run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+            best = max(best, run)
+            previous = day
+        return best
+
+    def longest_gap(self):
+        # Longest stretch between two consecutive commits, in hours
+        ordered = sorted(self.timestamps)
+        gap = max((b - a for a, b in zip(ordered, ordered[1:])), default=0)
+        return gap / 3600
+
+    def active_days(self, days=30, now=None):
+        # How many of the last `days` days had a commit
+        today = datetime.fromtimestamp(time.time() if now is None else now).date()
+        start = today - timedelta(days=days - 1)
+        return sum(1 for day in self.commit_days() if start <= day <= today)
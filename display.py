@@ -1,16 +1,17 @@
-import time
 import random
-import re
 from rich.console import Console, Group
 from rich.panel import Panel
-from rich.layout import Layout
 from rich.text import Text
 from rich.table import Table
 from rich.align import Align
+from rich.measure import Measurement
+from rich.segment import Segment
+from rich.cells import cell_len
 from rich import box
 from menu_system import MenuState
+from glitch import GlitchEngine, corrupt_with
+from sprites import PET_SPRITES
 from rich.rule import Rule
-import os
 
 
 console = Console(force_terminal=True)
@@ -33,66 +34,17 @@ THEME = {
 }
 
 
-def load_sprite_frames(filename):
-    """
-    Load sprite frames from a text file.
-    If file has multiple frames, they're separated by blank lines.
-    """
-    try:
-        path = f"pet_sprites/{filename}"
-        
-        # Opens with utf-8, fallback to system default if it fails
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            with open(path, 'r') as f:
-                content = f.read()
-        
-        if "===" in content:
-            frames = content.split("===")
-        else:
-            frames = re.split(r'\n{3,}', content)
+# Repos listed in the git view (MultiRepoTracker), newest commit first
+MAX_REPO_ROWS = 8
 
-        frames = [frame.strip('\n') for frame in frames if frame.strip()]
-        
-        return frames if frames else ["???"]
-        
-    except FileNotFoundError:
-        return ["???"]
-    except Exception as e:
-        return [f"Error: {str(e)}"]
-
-
-PET_SPRITES = {
-    "happy": load_sprite_frames("happy.txt"),
-    "normal": load_sprite_frames("normal.txt"),
-    "sadness": load_sprite_frames("sadness.txt"),
-    "fear": load_sprite_frames("fear.txt"),
-    "anger": load_sprite_frames("anger.txt"),
-    "regular": load_sprite_frames("regular.txt"),
-    "dance": load_sprite_frames("dance.txt"),
-    "sit": load_sprite_frames("sit.txt"),
-    "sing": load_sprite_frames("happy.txt"), 
-    "feed": load_sprite_frames("happy.txt"),  
-    "play": load_sprite_frames("happy.txt"),
-}
+
+# Shared glitch banks for the pet sprite; seed it for reproducible frames
+GLITCH = GlitchEngine()
 
 
 def corrupt_text(text, corruption_level):
     # Corrupt text based on corruption level (0-100)
-    if corruption_level < 20:
-        return text
-    
-    corrupted = ""
-    for char in text:
-        if char == ' ' or char == '\n':
-            corrupted += char
-        elif random.random() < (corruption_level / 200):
-            corrupted += random.choice(['?', '█', '▓', '░', '*', '#'])
-        else:
-            corrupted += char
-    return corrupted
+    return corrupt_with(random, text, corruption_level)
 
 
 def get_pet_art(pet, frame_index=0, current_action=None):
@@ -105,8 +57,8 @@ def get_pet_art(pet, frame_index=0, current_action=None):
         frame = frames[frame_index % len(frames)]
         return frame
     
-    bond = pet.pet_memory["bond_level"]
-    corruption = pet.player_memory["file_corruption"]
+    bond = pet.bond_level
+    corruption = pet.file_corruption
     
     try:
         bond = int(bond)
@@ -128,19 +80,76 @@ def get_pet_art(pet, frame_index=0, current_action=None):
     if not frames: frames = ["???"]
     frame = frames[frame_index % len(frames)]
     
-    # ✨ RANDOM INTERMITTENT GLITCH
-    if corruption > 50:
-        # Higher corruption = higher chance of glitch
-        glitch_probability = (corruption - 50) / 150  # 0% at 50, 33% at 100
-        
-        if random.random() < glitch_probability:
-            frame = corrupt_text(frame, corruption)
+    # ✨ RANDOM INTERMITTENT GLITCH (a pick from a pre-corrupted bank)
+    if GLITCH.should_glitch(corruption):
+        frame = GLITCH.variant(frame, corruption)
     
     return frame
 
 
 
 
+class SpriteFrame:
+    """
+    One sprite frame, centered and rendered to segments once per available
+    width. Later frames at the same width are a lookup instead of a layout
+    pass; a resize renders at the new width and drops the old ones.
+    """
+
+    # Table layout measures at one width and renders at another
+    MAX_WIDTHS = 4
+
+    def __init__(self, art_str, style="bold white"):
+        self.plain = art_str
+        self.cell_width = max((cell_len(line) for line in art_str.split("\n")), default=0)
+        self._renderable = Align.center(Text(art_str, style=style, justify="center"))
+        self._lines = {}
+        self._measurements = {}
+
+    def __rich_measure__(self, console, options):
+        measurement = self._measurements.get(options.max_width)
+        if measurement is None:
+            if len(self._measurements) >= self.MAX_WIDTHS:
+                self._measurements.clear()
+            measurement = Measurement.get(console, options, self._renderable)
+            self._measurements[options.max_width] = measurement
+        return measurement
+
+    def __rich_console__(self, console, options):
+        lines = self._lines.get(options.max_width)
+        if lines is None:
+            if len(self._lines) >= self.MAX_WIDTHS:
+                self._lines.clear()
+            lines = console.render_lines(self._renderable, options.update(height=None))
+            self._lines[options.max_width] = lines
+        new_line = Segment.line()
+        for line in lines:
+            yield from line
+            yield new_line
+
+
+# Sprite text -> SpriteFrame. Sprite files give a fixed set of frames; glitched
+# frames are random, so the cache is cleared if it grows past this.
+SPRITE_FRAME_CACHE_SIZE = 256
+_sprite_frames = {}
+
+
+def get_sprite_frame(art_str):
+    frame = _sprite_frames.get(art_str)
+    if frame is None:
+        if len(_sprite_frames) >= SPRITE_FRAME_CACHE_SIZE:
+            _sprite_frames.clear()
+        frame = _sprite_frames[art_str] = SpriteFrame(art_str)
+    return frame
+
+
+def get_pet_frame(pet, frame_index=0, current_action=None):
+    # get_pet_art() as a pre-rendered SpriteFrame
+    return get_sprite_frame(get_pet_art(pet, frame_index, current_action))
+
+
+
+
 # Simple stat bar 
 def create_stat_bar(value: int, width: int = 15, filled: str = "█", empty: str = "░") -> str:
     # Create a visual stat bar.
@@ -151,35 +160,47 @@ def create_stat_bar(value: int, width: int = 15, filled: str = "█", empty: str
 
 
 # Horizontal stat bars
-def create_stats_panel(pet):
-    # Create Happy Index panel with horizontal bars
+# Sparkline width and time span under each stat bar
+SPARK_WIDTH = 15
+SPARK_WINDOW = 7 * 86400
+
+
+def create_stats_panel(pet, history=None):
+    # Create Happy Index panel with horizontal bars (and a week of history under each, if given)
     stats_grid = Table.grid(expand=True, padding=(1, 2))
     stats_grid.add_column(width=12, justify="left")  # Emoji + Label
     stats_grid.add_column(ratio=1)                    # Bar
     stats_grid.add_column(width=5, justify="right")   # Percentage
     
-    def create_bar_row(emoji, label, value, color):
+    def create_bar_row(emoji, label, value, color, stat=None, invert=False):
         value = max(0, min(100, int(value)))
         bar_str = create_stat_bar(value, width=15)
         
         label_text = Text(f"{emoji} {label}", style="bold white")
         bar_text = Text(bar_str, style=color)
+        if history is not None and stat:
+            bar_text.append("\n" + history.sparkline(stat, SPARK_WIDTH, SPARK_WINDOW, invert=invert),
+                            style=f"dim {color}")
         percent_text = Text(f"{value}%", style="dim white")
         
         return (label_text, bar_text, percent_text)
     
-    stats_grid.add_row(*create_bar_row("😊", "Happy", pet.stats['happiness'], THEME['success']))
-    stats_grid.add_row(*create_bar_row("💝", "Bond", pet.pet_memory['bond_level'], THEME['warning']))
-    stats_grid.add_row(*create_bar_row("🧠", "Memory", pet.pet_memory['name_clarity'], THEME['primary']))
-    stats_grid.add_row(*create_bar_row("💾", "Backup", 100 - pet.player_memory['file_corruption'], THEME['danger']))
+    stats_grid.add_row(*create_bar_row("😊", "Happy", pet.happiness, THEME['success'], "happiness"))
+    stats_grid.add_row(*create_bar_row("💝", "Bond", pet.bond_level, THEME['warning'], "bond_level"))
+    stats_grid.add_row(*create_bar_row("🧠", "Memory", pet.name_clarity, THEME['primary'], "name_clarity"))
+    stats_grid.add_row(*create_bar_row("💾", "Backup", 100 - pet.file_corruption, THEME['danger'],
+                                       "file_corruption", invert=True))
     
     return stats_grid
 
 
-def create_git_panel(git_info):
+def create_git_panel(git_info, refreshing=False):
     # Create Git Index panel showing commit graph + info
     git_table = Table.grid(expand=True, padding=(0, 1))
     git_table.add_column(justify="left")
+
+    if refreshing:
+        git_table.add_row(Text("⏳ refreshing…", style=f"dim {THEME['text_normal']}"))
     
     if git_info.get('graph'):
         git_table.add_row(Text("📈 Commit Graph", style=f"bold {THEME['warning']}"))  # Yellow title
@@ -212,10 +233,35 @@ def create_git_panel(git_info):
     git_table.add_row(Text(f"👤 {git_info.get('author', 'N/A')}", style="dim white"))
     git_table.add_row(Text(f"⏰ {git_info.get('time_ago', 'N/A')}", style=THEME['warning']))
     git_table.add_row(Text(f"📝 {git_info.get('total', 0)} commits", style=THEME['success']))
+
+    repos = git_info.get('repos')
+    if repos:
+        git_table.add_row(Text(""))
+        git_table.add_row(Text(f"🗂️  Repos ({git_info.get('repos_active', 0)}/{len(repos)} active today)",
+                               style=f"bold {THEME['highlight']}"))
+        for status in repos[:MAX_REPO_ROWS]:
+            git_table.add_row(create_repo_row(status))
+        if len(repos) > MAX_REPO_ROWS:
+            git_table.add_row(Text(f"   … {len(repos) - MAX_REPO_ROWS} more", style="dim white"))
     
     return git_table
 
 
+def create_repo_row(status):
+    # One repo: name, age of its last commit, and how long the last query took
+    row = Text("   ")
+    row.append(f"{status.name[:10]:<10} ", style="white")
+    if status.error == "timeout":
+        row.append(f"{'timed out':<13}", style=THEME['danger'])
+    elif status.info:
+        row.append(f"{status.info.get('time_ago', '')[:13]:<13}", style=THEME['warning'])
+    else:
+        row.append(f"{(status.error or 'no data')[:13]:<13}", style="dim white")
+    if status.elapsed is not None:
+        row.append(f" {status.elapsed * 1000:.1f}ms", style=f"dim {THEME['text_normal']}")
+    return row
+
+
 
 def create_git_graph_panel(graph_text):
     # Create Git Graph panel showing commit tree
@@ -240,7 +286,53 @@ def create_horizontal_divider():
     return Rule(style=THEME['divider'])
 
 
-def create_game_layout(pet, menu, current_message="", frame_index=0, current_action=None, view_mode="stats", git_info=None):
+def create_menu_content(menu):
+    # Right-hand side of the menu: submenu items or the exit prompt
+    show_actions = menu.state == MenuState.ACTIONS or (
+        menu.state == MenuState.MAIN and 
+        menu.main_items[menu.selected_index].label == "Actions"
+    )
+    
+    show_settings = menu.state == MenuState.SETTINGS or (
+        menu.state == MenuState.MAIN and 
+        menu.main_items[menu.selected_index].label == "Settings"
+    )
+    
+    if show_actions:
+        action_table = Table.grid(padding=(0, 2))
+        for i, item in enumerate(menu.action_items):
+            if menu.state == MenuState.ACTIONS and i == menu.selected_index:
+                style = f"bold {THEME['highlight']}"
+                prefix = ">"
+            else:
+                style = "dim white"
+                prefix = " "
+            action_table.add_row(Text(f"{prefix} {item.label}", style=style))
+        content_panel_inner = action_table
+    
+    elif show_settings:
+        settings_table = Table.grid(padding=(0, 2))
+        for i, item in enumerate(menu.settings_items):
+            if menu.state == MenuState.SETTINGS and i == menu.selected_index:
+                style = f"bold {THEME['highlight']}"
+                prefix = ">"
+            else:
+                style = "dim white"
+                prefix = " "
+            settings_table.add_row(Text(f"{prefix} {item.label}", style=style))
+        content_panel_inner = settings_table
+        
+    elif menu.main_items[menu.selected_index].label == "Exit":
+        content_panel_inner = Align.center(
+            Text("Are you sure you want to leave?\nYour pet will miss you.", style="dim"),
+            vertical="middle"
+        )
+    else:
+        content_panel_inner = Text("")
+    return content_panel_inner
+
+
+def create_game_layout(pet, menu, current_message="", frame_index=0, current_action=None, view_mode="stats", git_info=None, git_refreshing=False, history=None):
     # Single box layout with internal dividers
     
     # === TOP SECTION: Pet (left) | Stats (right) ===
@@ -253,7 +345,7 @@ def create_game_layout(pet, menu, current_message="", frame_index=0, current_act
     art_str = get_pet_art(pet, frame_index, current_action)
     pet_content = Group(
         Text(""),
-        Align.center(Text(art_str, style="bold white", justify="center")),
+        get_sprite_frame(art_str),
         Text(""),
         Align.center(Text(current_message if current_message else "", 
                          style=f"bold {THEME['highlight']}", 
@@ -261,11 +353,11 @@ def create_game_layout(pet, menu, current_message="", frame_index=0, current_act
     )
     
     # Right: Stats or Git Info
-    if view_mode in ["git", "git_graph"] and git_info:
+    if view_mode in ["git", "git_graph"] and (git_info or git_refreshing):
         info_content = Group(
             Align.center(Text("Git Index", style=f"bold {THEME['secondary']}")),
             Text(""),
-            create_git_panel(git_info)
+            create_git_panel(git_info or {}, refreshing=git_refreshing)
         )
 
     elif view_mode == "git_graph" and git_info:
@@ -278,7 +370,7 @@ def create_game_layout(pet, menu, current_message="", frame_index=0, current_act
         info_content = Group(
             Align.center(Text("Happy Index", style=f"bold {THEME['success']}")),
             Text(""),
-            create_stats_panel(pet)
+            create_stats_panel(pet, history)
     )
     
     # Vertical divider
@@ -310,48 +402,7 @@ def create_game_layout(pet, menu, current_message="", frame_index=0, current_act
         
         sidebar_content.add_row(indicator + label)
     
-    # Content Panel
-    show_actions = menu.state == MenuState.ACTIONS or (
-        menu.state == MenuState.MAIN and 
-        menu.main_items[menu.selected_index].label == "Actions"
-    )
-    
-    show_settings = menu.state == MenuState.SETTINGS or (
-        menu.state == MenuState.MAIN and 
-        menu.main_items[menu.selected_index].label == "Settings"
-    )
-    
-    if show_actions:
-        action_table = Table.grid(padding=(0, 2))
-        for i, item in enumerate(menu.action_items):
-            if menu.state == MenuState.ACTIONS and i == menu.selected_index:
-                style = f"bold {THEME['highlight']}"
-                prefix = ">"
-            else:
-                style = "dim white"
-                prefix = " "
-            action_table.add_row(Text(f"{prefix} {item.label}", style=style))
-        content_panel_inner = action_table
-    
-    elif show_settings:
-        settings_table = Table.grid(padding=(0, 2))
-        for i, item in enumerate(menu.settings_items):
-            if menu.state == MenuState.SETTINGS and i == menu.selected_index:
-                style = f"bold {THEME['highlight']}"
-                prefix = ">"
-            else:
-                style = "dim white"
-                prefix = " "
-            settings_table.add_row(Text(f"{prefix} {item.label}", style=style))
-        content_panel_inner = settings_table
-        
-    elif menu.main_items[menu.selected_index].label == "Exit":
-        content_panel_inner = Align.center(
-            Text("Are you sure you want to leave?\nYour pet will miss you.", style="dim"),
-            vertical="middle"
-        )
-    else:
-        content_panel_inner = Text("")
+    content_panel_inner = create_menu_content(menu)
     
     # Vertical divider for menu
     menu_vertical_divider = Text("│\n" * 12, style=THEME['divider'])
@@ -373,3 +424,132 @@ def create_game_layout(pet, menu, current_message="", frame_index=0, current_act
         box=box.ROUNDED,
         padding=(1, 2)
     )
+
+
+
+class _Slot:
+    """Fixed node in GameView's tree whose content is swapped between frames."""
+
+    def __init__(self, renderable=""):
+        self.renderable = renderable
+
+    @property
+    def vertical(self):
+        # Table cells read vertical alignment off the renderable itself
+        return getattr(self.renderable, "vertical", None)
+
+    def __rich_console__(self, console, options):
+        yield self.renderable
+
+    def __rich_measure__(self, console, options):
+        return Measurement.get(console, options, self.renderable)
+
+
+class GameView:
+    """
+    Retained version of create_game_layout: the panel, grids, dividers and
+    menu rows are built once and update() only swaps the parts that changed.
+    """
+
+    def __init__(self, menu):
+        self._art = _Slot()
+        self._message = _Slot()
+        self._info = _Slot()
+        self._content = _Slot()
+        self._sidebar = [_Slot() for _ in menu.main_items]
+
+        self._message_key = None
+        self._info_key = None
+        self._content_cache = {}
+        self._sidebar_keys = [None] * len(self._sidebar)
+        self._sidebar_cache = {}
+
+        top_section = Table.grid(expand=True, padding=(1, 1))
+        top_section.add_column(ratio=1)   # Pet side
+        top_section.add_column(width=1)   # Vertical divider
+        top_section.add_column(ratio=1)   # Stats side
+        pet_content = Group(
+            Text(""),
+            self._art,
+            Text(""),
+            Align.center(self._message)
+        )
+        top_section.add_row(pet_content, Text("│\n" * 26, style=THEME['divider']), self._info)
+
+        bottom_section = Table.grid(expand=True, padding=(1, 1))
+        bottom_section.add_column(width=20)
+        bottom_section.add_column(width=1)
+        bottom_section.add_column(ratio=1)
+        sidebar_content = Table.grid(padding=(1, 1))
+        for slot in self._sidebar:
+            sidebar_content.add_row(slot)
+        bottom_section.add_row(sidebar_content, Text("│\n" * 12, style=THEME['divider']), self._content)
+
+        self.panel = Panel(
+            Group(top_section, create_horizontal_divider(), bottom_section),
+            title=f"[{THEME['primary']}] DevGotchi[/]",
+            border_style=THEME["border"],
+            box=box.ROUNDED,
+            padding=(1, 2)
+        )
+
+    def update(self, pet, menu, current_message="", frame_index=0, current_action=None, view_mode="stats", git_info=None, git_refreshing=False, history=None):
+        # Same arguments as create_game_layout; returns the (same) retained Panel.
+        self._art.renderable = get_pet_frame(pet, frame_index, current_action)
+        self._update_message(current_message)
+        self._update_info(pet, view_mode, git_info, git_refreshing, history)
+        self._update_menu(menu)
+        return self.panel
+
+    def _update_message(self, message):
+        if message != self._message_key:
+            self._message_key = message
+            self._message.renderable = Text(message or "",
+                                            style=f"bold {THEME['highlight']}",
+                                            justify="center")
+
+    def _update_info(self, pet, view_mode, git_info, git_refreshing, history=None):
+        if view_mode in ["git", "git_graph"] and (git_info or git_refreshing):
+            # git_info is an immutable snapshot; unchanged state compares by identity
+            key = ("git", git_info, git_refreshing)
+            if key != self._info_key:
+                self._info.renderable = Group(
+                    Align.center(Text("Git Index", style=f"bold {THEME['secondary']}")),
+                    Text(""),
+                    create_git_panel(git_info or {}, refreshing=git_refreshing)
+                )
+        else:
+            # Sparklines only change when the history writes new samples
+            key = ("stats", pet.levels(), history and history.version)
+            if key != self._info_key:
+                self._info.renderable = Group(
+                    Align.center(Text("Happy Index", style=f"bold {THEME['success']}")),
+                    Text(""),
+                    create_stats_panel(pet, history)
+                )
+        self._info_key = key
+
+    def _update_menu(self, menu):
+        for i, item in enumerate(menu.main_items):
+            is_selected = (menu.state == MenuState.MAIN and i == menu.selected_index)
+            key = (item.label, is_selected)
+            if key == self._sidebar_keys[i]:
+                continue
+            row = self._sidebar_cache.get(key)
+            if row is None:
+                if is_selected:
+                    label = Text(f" {item.label.upper()} ", style=f"bold {THEME['text_active']} on {THEME['tab_active']}")
+                    indicator = Text("● ", style=THEME['tab_active'])
+                else:
+                    label = Text(f" {item.label.upper()} ", style=f"{THEME['text_normal']}")
+                    indicator = Text("  ")
+                row = self._sidebar_cache[key] = indicator + label
+            self._sidebar[i].renderable = row
+            self._sidebar_keys[i] = key
+
+        current = menu.main_items[menu.selected_index].label if menu.state == MenuState.MAIN else None
+        key = (menu.state, menu.selected_index, current)
+        content = self._content_cache.get(key)
+        if content is None:
+            content = self._content_cache[key] = create_menu_content(menu)
+        self._content.renderable = content
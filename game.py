@@ -1,21 +1,26 @@
 import sys
 import time
 import os
+import signal
+import threading
+from collections import deque
 
 if os.name == 'posix':
     import tty
     import termios
 
-from rich.live import Live
-from rich.console import Console
-from pynput import keyboard
-
-# Local imports
+# Local imports. rich (display), pynput and the git modules are imported where
+# they are first needed, so the first frame isn't waiting on them.
 from pet_system.pet_data import Pet
-from display import console, create_game_layout
-from git_tracker import is_git_repo, hours_since_last_commit
-from save_system import save_pet, load_pet
-from menu_system import Menu, MenuState
+from pet_system.decay import DecayEngine
+from save_system import load_save, save_exists
+from menu_system import Menu
+from render_scheduler import RenderScheduler
+from input_queue import InputQueue
+from autosave import AutoSaver
+from settings import (ANIMATION_INTERVAL, IDLE_WAKEUP, INPUT_BACKEND, GAME_KEYS, ANIMATED_ACTIONS,
+                      ACTION_DURATION, HISTORY_SAMPLE_INTERVAL, DECAY_TICK, DECAY_CHECK_INTERVAL,
+                      PUSHED_POLL_INTERVAL, EXIT_AFTER_FIRST_FRAME)
 
 
 class Game:
@@ -23,7 +28,8 @@ class Game:
         self.running = True
         self.message = "Welcome back!"
         self.message_timer = time.time() + 3
-        self.pending_key = None
+        self.scheduler = RenderScheduler()
+        self.inputs = InputQueue(on_put=self.scheduler.wake)
         
         # Save terminal settings
         if os.name == 'posix':
@@ -31,11 +37,29 @@ class Game:
             self.old_settings = termios.tcgetattr(self.fd)
 
         self.view_mode = "stats"
+        # Started after the first frame, see _start_background()
+        self.git_poller = None
+        self.listener = None
+        self._keyboard = None
+        self._pending_decay = None
+        self._next_decay_at = 0
+        self.history = None
+        self.repos = None
+        self.commit_events = None
+        self.git_watcher = None
+        self._commit_events = deque()   # hook events waiting for the game loop
+        self._commit_index = None       # this repo's CommitIndex, kept between decay checks
+        self._decay_wakeup = threading.Event()   # set to run the decay check now
+        self._sampled_stats = None
+        self._next_sample_at = 0
         
-        if os.path.exists("pet_save.json"):
-            self.pet = load_pet()
+        # Save metadata (schema version, format, last save time), None for a new pet
+        self.save_meta = None
+        if save_exists():
+            self.pet, self.save_meta = load_save()
         else:
             # First time setup - ask for names
+            from display import console
             console.print("\n[bold cyan] Welcome to DevGotchi![/]\n")
             owner_name = input("What's your name? ").strip() or "Friend"
             pet_name = input("What will you name your duck? ").strip() or "Buddy"
@@ -44,65 +68,234 @@ class Game:
             console.print(f"\n[green] {pet_name} hatched! They'll remember you, {owner_name}...[/]")
             console.print("[dim]Press any key to continue...[/]\n")
             input()
-            
-        self._check_decay()
-        
-        # Start keyboard listener
-        self.listener = keyboard.Listener(on_press=self._on_key_press)
+
+        # Saves in the background whenever the pet changes
+        self.autosaver = AutoSaver(self.pet)
+        self.pet.on_change = self.autosaver.mark_dirty
+        if self.save_meta is None:
+            self.autosaver.mark_dirty("hatch")
+
+        # Catches the pet up on time away once the commit activity is known, then ticks
+        self.decay = DecayEngine(self.pet)
+
+    def _start_background(self):
+        # Everything that can wait until the pet is on screen: keyboard, git polling, decay check
+        from git_tracker import GitPoller
+
+        if INPUT_BACKEND == "pynput":
+            from pynput import keyboard
+            self._keyboard = keyboard
+            self.listener = keyboard.Listener(on_press=self._on_key_press)
+        else:
+            from terminal_input import TerminalInput
+            self.listener = TerminalInput(on_key=self._on_terminal_key)
         self.listener.start()
 
+        self._open_repos()
+        self.git_poller = GitPoller(interval=5.0, graph_lines=6, repos=self.repos)
+        self.git_poller.on_update = lambda state: self.scheduler.wake()
+        self.git_poller.start()
+
+        from commit_events import CommitEvents
+        self.commit_events = CommitEvents(on_event=self._on_commit_event)
+        pushed = self.commit_events.start() and self._hooks_installed()
+        self.git_watcher = self._open_git_watcher(on_change=self.git_poller.request_refresh)
+        if pushed or self.git_watcher:
+            self.git_poller.interval = PUSHED_POLL_INTERVAL
+
+        self.autosaver.start()
+        self._open_history()
+
+        threading.Thread(target=self._decay_checks, name="decay-check", daemon=True).start()
+
+    def _open_history(self):
+        # Stat history is optional: without it the stats panel just has no sparklines
+        from stat_history import StatHistory
+        import sqlite3
+        try:
+            self.history = StatHistory()
+        except sqlite3.Error:
+            self.history = None
+
+    def _open_repos(self):
+        # Other repos to track, from DEVGOTCHI_REPOS (None when unset)
+        from multi_repo import repos_from_env
+        self.repos = repos_from_env()
+
+    def _open_git_watcher(self, on_change):
+        # Started GitWatcher for this repo and DEVGOTCHI_REPOS, or None outside any repo
+        from git_reader import find_git_dir
+        from git_watch import GitWatcher
+        paths = [None] + (self.repos.paths if self.repos is not None else [])
+        git_dirs = [git_dir for git_dir in dict.fromkeys(find_git_dir(path) for path in paths) if git_dir]
+        if not git_dirs:
+            return None
+        watcher = GitWatcher(git_dirs, on_change)
+        watcher.start()
+        return watcher
+
+    def _hooks_installed(self):
+        # True if every tracked repo reports its commits through our hooks
+        from commit_events import hooks_installed
+        from git_tracker import is_git_repo
+        paths = [None] if is_git_repo() else []
+        if self.repos is not None:
+            paths += self.repos.paths
+        return bool(paths) and all(hooks_installed(path) for path in paths)
+
+    def _on_commit_event(self, event):
+        """Callback from the commit event listener thread"""
+        self._commit_events.append(event)
+        self.scheduler.wake()
+
+    def _notice_commit(self, event):
+        # A hook reported a commit or merge: refresh git now and let the pet react
+        if self.git_poller:
+            self.git_poller.request_refresh()
+        self._record_event("commit", event.get("event"))
+        if event.get("event") == "post-merge":
+            self.set_message("🔀 Merged!", 2)
+        else:
+            self.set_message("📝 Commit spotted!", 2)
+
+    def _sample_history(self, now):
+        # Record a stat sample when stats changed or the sample interval passed
+        if self.history is None:
+            return
+        stats = self._stat_signature()
+        if stats != self._sampled_stats or now >= self._next_sample_at:
+            self.history.record(self.pet, now)
+            self._sampled_stats = stats
+            self._next_sample_at = now + HISTORY_SAMPLE_INTERVAL
+
+    def _record_event(self, kind, detail=None):
+        if self.history is not None:
+            self.history.record_event(kind, detail)
+
+    def _decay_checks(self):
+        # Every DECAY_CHECK_INTERVAL, or sooner when _decay_wakeup is set
+        while self.running:
+            self._check_decay()
+            self._decay_wakeup.wait(DECAY_CHECK_INTERVAL)
+            self._decay_wakeup.clear()
+
     def _check_decay(self):
-        if is_git_repo():
-             hours = hours_since_last_commit()
-             if hours > 24:
-                 self.set_message(f"⚠️ {hours:.0f}h since last commit!", 5)
-                 self.pet.decay_memory(hours)
+        # Runs off the main thread; the game loop hands the result to the decay engine
+        self._pending_decay = self._commit_activity()
+        self.scheduler.wake()
+
+    def _apply_pending_decay(self):
+        last_commit, active_days = self._pending_decay
+        self._pending_decay = None
+        catching_up = not self.decay.ready
+        self.decay.set_commit_activity(last_commit, active_days)
+        self._advance_decay(catching_up)
+
+    def _advance_decay(self, catching_up=False):
+        # Apply the decay owed since the last update; returns True if the pet changed
+        hours = self.decay.advance()
+        self._next_decay_at = time.time() + DECAY_TICK
+        if not hours:
+            return False
+        if catching_up:
+            # Time away: the game was closed or this is the first check of the session
+            self.set_message(f"⚠️ {self.decay.commit_gap():.0f}h since last commit!", 5)
+            self._record_event("commit_gap", f"{hours:.1f}h")
+        return True
+
+    def _commit_activity(self):
+        # (time of the last commit, active days in the last 30). A commit in any
+        # of the DEVGOTCHI_REPOS counts as the last commit.
+        last_commit, active_days = self._repo_commit_activity()
+        if self.repos is not None:
+            self.repos.poll()
+            latest = self.repos.last_commit_time()
+            if latest is not None and (last_commit is None or latest > last_commit):
+                last_commit = latest
+        return last_commit, active_days
+
+    def _repo_commit_activity(self):
+        # _commit_activity() for the current repo, from the commit index; (None, 0) outside a git repo
+        from git_tracker import get_last_commit_time, is_git_repo
+        from git_reader import GitObjectError
+        from commit_index import CommitIndex
+
+        if not is_git_repo():
+            return None, 0
+        if self._commit_index is None:
+            self._commit_index = CommitIndex()
+        commit_index = self._commit_index
+        try:
+            commit_index.update()
+        except (GitObjectError, OSError, ValueError):
+            commit_index = None
+        if commit_index is None or not len(commit_index):
+            last_commit = get_last_commit_time()
+            return (last_commit.timestamp() if last_commit else None), 0
+        return commit_index.last_commit_time(), commit_index.active_days(30)
 
     def set_message(self, text, duration=2):
         self.message = text
         self.message_timer = time.time() + duration
     
+    def _on_terminal_key(self, key):
+        """Callback from the terminal input reader"""
+        if key in GAME_KEYS:
+            self.inputs.put(key)
+
     def _on_key_press(self, key):
-        """Callback from keyboard listener"""
+        """Callback from the pynput keyboard listener"""
+        keyboard = self._keyboard
+        pressed = None
         try:
             if key == keyboard.Key.up:
-                self.pending_key = 'UP'
+                pressed = 'UP'
             elif key == keyboard.Key.down:
-                self.pending_key = 'DOWN'
+                pressed = 'DOWN'
             elif key == keyboard.Key.right:
-                self.pending_key = 'RIGHT'
+                pressed = 'RIGHT'
             elif key == keyboard.Key.left:
-                self.pending_key = 'LEFT'
+                pressed = 'LEFT'
             elif key == keyboard.Key.enter:
-                self.pending_key = 'ENTER'
+                pressed = 'ENTER'
             elif hasattr(key, 'char'):
                 if key.char == 'q':
-                    self.pending_key = 'q'
+                    pressed = 'q'
         except:
             pass
+        if pressed:
+            self.inputs.put(pressed)
 
     def handle_command(self, command):
         if command == "quit":
-            save_pet(self.pet)
+            self.autosaver.flush(event="quit")
             self.running = False
-            self.listener.stop()
+            if self.listener:
+                self.listener.stop()
         elif command == "git_status":
             self.view_mode = "git_graph"
+            self.git_poller.request_refresh(graph=True)
             self.set_message("Showing Git Graph", 2)    
         
         elif command == "show_stats":
             self.view_mode = "stats"
+            self.git_poller.request_refresh(graph=False)
             self.set_message("Showing Pet Stats", 2)
         
         elif command == "decay":
             self.set_message("⏱️  Simulating decay...", 2)
             self.pet.decay_memory(hours_passed=10)
+            self._record_event("decay", "10h")
 
         elif command == "feed":
-            self.pet.stats['happiness'] = min(100, self.pet.stats['happiness'] + 15)
+            self.pet.feed()
+            self.autosaver.mark_dirty("feed")
+            self._record_event("feed")
             self.set_message("🍖 Yummy!", 1.5)
         elif command == "play":
-            self.pet.pet_memory['bond_level'] = min(100, self.pet.pet_memory['bond_level'] + 5)
+            self.pet.play()
+            self.autosaver.mark_dirty("play")
+            self._record_event("play")
             self.set_message("🎾 So fun!", 1.5)
         elif command == "dance":
             self.set_message("💃 Dancing!", 1.5)
@@ -111,99 +304,207 @@ class Game:
         elif command == "sing":
             self.set_message("🎵 Singing!", 1.5)
     
+    def apply_key(self, menu, key, count=1):
+        # Apply one input event; returns the action to animate if one was started
+        if key == 'UP':
+            for _ in range(count):
+                menu.navigate_up()
+        elif key == 'DOWN':
+            for _ in range(count):
+                menu.navigate_down()
+        elif key == 'RIGHT':
+            for _ in range(count):
+                menu.navigate_right()
+        elif key == 'LEFT':
+            for _ in range(count):
+                menu.navigate_left()
+        elif key == 'ENTER':
+            action = menu.select()
+            if action:
+                self.handle_command(action)
+                if action in ANIMATED_ACTIONS:
+                    return action
+        elif key == 'q':
+            self.handle_command('quit')
+        return None
+
     def cleanup(self):
-        """Restore terminal to normal state"""
-        self.listener.stop()
+        """Save, then restore terminal to normal state"""
+        # First, so progress is kept even if the terminal is already gone
+        self.autosaver.stop()
+        if self.listener:
+            self.listener.stop()
+        if self.commit_events:
+            self.commit_events.stop()
+        if self.git_watcher:
+            self.git_watcher.stop()
+        if self.git_poller:
+            self.git_poller.stop()
+        if self.history is not None:
+            self.history.close()
+            self.history = None
+        if self.repos is not None:
+            self.repos.close()
+
+        # Only loaded if the git modules were ever imported
+        git_tracker = sys.modules.get('git_tracker')
+        if git_tracker:
+            git_tracker.close_cat_file()
 
         if os.name == 'posix':
             termios.tcsetattr(self.fd, termios.TCSADRAIN, self.old_settings)
 
+    def _stat_signature(self):
+        return self.pet.levels()
+
+    def _on_resize(self, signum, frame):
+        self.scheduler.wake()
+
     def run(self):
+        from rich.live import Live
+        from display import console, GameView
+
+        self.autosaver.install_exit_hooks()
         if os.name == 'posix':
             tty.setcbreak(self.fd)
+            signal.signal(signal.SIGWINCH, self._on_resize)
         
         console.clear()
         
         menu = Menu()
+        view = GameView(menu)
         frame_index = 0
-        loop_count = 0
+        next_frame_at = 0
         current_action = None 
         action_timer = 0       
+        message_shown = True
+        last_git_state = None
+        last_stats = None
+        last_history = None
         
         try:
             with Live(
-                create_game_layout(self.pet, menu, self.message, 0, None),  
+                view.update(self.pet, menu, self.message, 0, None),  
                 auto_refresh=False,
                 console=console,
                 screen=True,
                 refresh_per_second=20
             ) as live:
+                # The first frame is on screen; now start the slower work
+                if EXIT_AFTER_FIRST_FRAME:
+                    return
+                self._start_background()
+
                 while self.running:
-                    loop_count += 1
-                    
-        
-                    if current_action and time.time() > action_timer:
+                    now = time.time()
+                    dirty = self.scheduler.take_dirty()
+
+                    if self._commit_events:
+                        while self._commit_events:
+                            self._notice_commit(self._commit_events.popleft())
+                        # The new commit stops the decay; the check reads its time and active days
+                        self._decay_wakeup.set()
+                        dirty = True
+
+                    if self._pending_decay:
+                        self._apply_pending_decay()
+                        dirty = True
+                    elif self.decay.ready and now >= self._next_decay_at:
+                        dirty = self._advance_decay() or dirty
+
+                    if current_action and now > action_timer:
                         current_action = None
+                        dirty = True
                     
                     # Animate when message showing OR action playing
-                    if (time.time() < self.message_timer or current_action) and loop_count % 3 == 0:
+                    animating = now < self.message_timer or current_action
+                    if animating and now >= next_frame_at:
                         frame_index = (frame_index + 1) % 100
+                        next_frame_at = now + ANIMATION_INTERVAL
+                        dirty = True
 
-                    git_info = None
-                    if self.view_mode == "git":
-                        from git_tracker import get_commit_info, get_total_commits
-                        git_info = get_commit_info() or {}
-                        git_info['total'] = get_total_commits()
-                    elif self.view_mode == "git_graph":
-                        from git_tracker import get_commit_info, get_total_commits, get_git_graph
-                        git_info = get_commit_info() or {}
-                        git_info['total'] = get_total_commits()
-                        git_info['graph'] = get_git_graph(max_lines=6)  
+                    if message_shown != (now < self.message_timer):
+                        message_shown = not message_shown
+                        dirty = True
 
-                    
+                    # Latest published git data; the poller thread does the git work
+                    git_state = self.git_poller.latest()
+                    if git_state is not last_git_state:
+                        last_git_state = git_state
+                        dirty = dirty or self.view_mode in ("git", "git_graph")
+                    git_info = git_state.info if self.view_mode in ("git", "git_graph") else None
 
-                    if self.pending_key:
-                        key = self.pending_key
-                        self.pending_key = None
-                        
-                        if key == 'UP':
-                            menu.navigate_up()
-                        elif key == 'DOWN':
-                            menu.navigate_down()
-                        elif key == 'RIGHT':
-                            menu.navigate_right()
-                        elif key == 'LEFT':
-                            menu.navigate_left()
-                        elif key == 'ENTER':
-                            action = menu.select()
-                            if action:
-                                self.handle_command(action)
-                                
-                                if action in ['dance', 'sit', 'sing', 'feed', 'play']:
-                                    current_action = action
-                                    action_timer = time.time() + 2.0  # 2 seconds
-                                    frame_index = 0  # Reset to start of animation
-                        elif key == 'q':
-                            self.handle_command('quit')
-                    
-                    # Update display
-                    msg = self.message if time.time() < self.message_timer else ""
-                    live.update(
-                        create_game_layout(self.pet, menu, msg, frame_index, current_action, self.view_mode, git_info),
-                        refresh=True
-                    )
+                    # Every key since the last pass, in order (held arrows arrive as one event with a count)
+                    for key, count in self.inputs.drain():
+                        dirty = True
+                        action = self.apply_key(menu, key, count)
+                        if action:
+                            current_action = action
+                            action_timer = time.time() + ACTION_DURATION
+                            frame_index = 0  # Reset to start of animation
+                            next_frame_at = time.time() + ANIMATION_INTERVAL
+                        if not self.running:
+                            break
+
+                    stats = self._stat_signature()
+                    if stats != last_stats:
+                        last_stats = stats
+                        dirty = True
+
+                    self._sample_history(now)
+                    history_version = self.history.version if self.history else None
+                    if history_version != last_history:
+                        last_history = history_version
+                        dirty = dirty or self.view_mode == "stats"
+
+                    if not self.running:
+                        break
                     
-                    time.sleep(0.05)
+                    # Update display only when something changed
+                    if dirty:
+                        msg = self.message if time.time() < self.message_timer else ""
+                        message_shown = bool(msg)
+                        live.update(
+                            view.update(self.pet, menu, msg, frame_index, current_action, self.view_mode, git_info,
+                                        git_refreshing=git_state.refreshing, history=self.history),
+                            refresh=True
+                        )
+
+                    # Sleep until the next thing that can change the screen
+                    deadlines = [time.time() + IDLE_WAKEUP]
+                    if self.history is not None:
+                        deadlines.append(self._next_sample_at)
+                    if self.decay.ready:
+                        deadlines.append(self._next_decay_at)
+                    if now < self.message_timer:
+                        deadlines.append(self.message_timer)
+                    if current_action:
+                        deadlines.append(action_timer)
+                    if now < self.message_timer or current_action:
+                        deadlines.append(next_frame_at)
+                    self.scheduler.wait(min(deadlines))
         
         finally:
+            if os.name == 'posix':
+                signal.signal(signal.SIGWINCH, signal.SIG_DFL)
             self.cleanup()
 
 
 
 if __name__ == "__main__":
+    use_async = "--async" in sys.argv[1:]
+    if use_async and (os.name != 'posix' or INPUT_BACKEND != "terminal"):
+        # The async runtime reads keys from the terminal with loop.add_reader
+        print("--async needs a POSIX terminal and the terminal input backend "
+              "(unset DEVGOTCHI_INPUT); run without --async instead.")
+        sys.exit(2)
     game = Game()
     try:
-        game.run()
+        if use_async:
+            from async_runtime import run_async
+            run_async(game)
+        else:
+            game.run()
     except KeyboardInterrupt:
         game.cleanup()
         print("\nGoodbye!")
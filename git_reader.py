@@ -0,0 +1,519 @@
+import mmap
+import os
+import struct
+import time
+import zlib
+
+# Reads HEAD, refs and commit objects straight from .git without forking git.
+# Anything it can't handle raises GitObjectError so callers can fall back to
+# the git CLI.
+
+OBJ_COMMIT, OBJ_TREE, OBJ_BLOB, OBJ_TAG = 1, 2, 3, 4
+OBJ_OFS_DELTA, OBJ_REF_DELTA = 6, 7
+TYPE_NAMES = {OBJ_COMMIT: 'commit', OBJ_TREE: 'tree', OBJ_BLOB: 'blob', OBJ_TAG: 'tag'}
+
+MAX_DELTA_DEPTH = 64
+MAX_SYMREF_DEPTH = 5
+
+
+class GitObjectError(Exception):
+    pass
+
+
+def find_git_dir(start=None):
+    # Walk up from start (default: cwd) to the repo's .git directory.
+    if start is None and os.environ.get('GIT_DIR'):
+        return os.path.abspath(os.environ['GIT_DIR'])
+
+    path = os.path.abspath(start or os.getcwd())
+    while True:
+        candidate = os.path.join(path, '.git')
+        if os.path.isdir(candidate):
+            return candidate
+        if os.path.isfile(candidate):
+            # Worktrees and submodules use a "gitdir: <path>" pointer file
+            try:
+                with open(candidate, 'r') as f:
+                    line = f.readline().strip()
+            except OSError:
+                return None
+            if line.startswith('gitdir:'):
+                return os.path.normpath(os.path.join(path, line[len('gitdir:'):].strip()))
+            return None
+        # Bare repo, or running from inside .git itself
+        if (os.path.isfile(os.path.join(path, 'HEAD'))
+                and os.path.isdir(os.path.join(path, 'objects'))
+                and os.path.isdir(os.path.join(path, 'refs'))):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def get_common_dir(git_dir):
+    # Linked worktrees keep their refs and objects in the main repo's git dir.
+    try:
+        with open(os.path.join(git_dir, 'commondir'), 'r') as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    except OSError:
+        return git_dir
+
+
+def stat_key(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_ino, st.st_size)
+
+
+def format_relative_time(seconds):
+    # Same wording and rounding as git's %ar (show_date_relative in date.c).
+    seconds = int(seconds)
+    if seconds < 0:
+        return "in the future"
+
+    def unit(n, name):
+        return f"{n} {name}{'' if n == 1 else 's'} ago"
+
+    if seconds < 90:
+        return unit(seconds, 'second')
+    minutes = (seconds + 30) // 60
+    if minutes < 90:
+        return unit(minutes, 'minute')
+    hours = (minutes + 30) // 60
+    if hours < 36:
+        return unit(hours, 'hour')
+    days = (hours + 12) // 24
+    if days < 14:
+        return unit(days, 'day')
+    if days < 70:
+        return unit((days + 3) // 7, 'week')
+    if days < 365:
+        return unit((days + 15) // 30, 'month')
+    if days < 1825:
+        total_months = (days * 12 * 2 + 365) // (365 * 2)
+        years, months = divmod(total_months, 12)
+        year_text = f"{years} year{'' if years == 1 else 's'}"
+        if months:
+            return f"{year_text}, {months} month{'' if months == 1 else 's'} ago"
+        return f"{year_text} ago"
+    return unit((days + 183) // 365, 'year')
+
+
+def _parse_signature(value):
+    # "Name <email> 1700000000 +0100" -> (name, email, timestamp)
+    lt = value.find('<')
+    gt = value.find('>', lt)
+    if lt < 0 or gt < 0:
+        raise GitObjectError(f"Bad signature line: {value!r}")
+    name = value[:lt].strip()
+    email = value[lt + 1:gt]
+    parts = value[gt + 1:].split()
+    try:
+        timestamp = int(parts[0])
+    except (IndexError, ValueError):
+        raise GitObjectError(f"Bad signature date: {value!r}") from None
+    return name, email, timestamp
+
+
+def parse_commit(raw):
+    # Decode a raw commit object body into a plain dict.
+    header, _, body = raw.partition(b'\n\n')
+    encoding = 'utf-8'
+    fields = {}
+    parents = []
+    for line in header.split(b'\n'):
+        if not line or line[:1] == b' ':
+            continue  # continuation of a multi-line header (gpgsig, mergetag)
+        key, _, value = line.partition(b' ')
+        if key == b'parent':
+            parents.append(value.decode('ascii'))
+        elif key == b'encoding':
+            encoding = value.decode('ascii', 'replace')
+        else:
+            fields.setdefault(key, value)
+
+    if b'tree' not in fields or b'author' not in fields or b'committer' not in fields:
+        raise GitObjectError("Commit object is missing headers")
+
+    def decode(data):
+        try:
+            return data.decode(encoding, 'replace')
+        except LookupError:
+            return data.decode('utf-8', 'replace')
+
+    author, author_email, author_time = _parse_signature(decode(fields[b'author']))
+    _, _, commit_time = _parse_signature(decode(fields[b'committer']))
+
+    # %s: first paragraph of the message folded onto one line
+    subject_lines = []
+    for line in decode(body).lstrip('\n').split('\n'):
+        if not line.strip():
+            break
+        subject_lines.append(line.strip())
+
+    return {
+        'tree': fields[b'tree'].decode('ascii'),
+        'parents': parents,
+        'author': author,
+        'author_email': author_email,
+        'author_time': author_time,
+        'commit_time': commit_time,
+        'subject': ' '.join(subject_lines),
+        'message': decode(body),
+    }
+
+
+def _apply_delta(base, delta):
+    # Rebuild an object from its base and a git delta stream.
+    def varint(pos):
+        value = shift = 0
+        while True:
+            byte = delta[pos]
+            pos += 1
+            value |= (byte & 0x7f) << shift
+            shift += 7
+            if not byte & 0x80:
+                return value, pos
+
+    src_size, pos = varint(0)
+    dst_size, pos = varint(pos)
+    if src_size != len(base):
+        raise GitObjectError("Delta base size mismatch")
+
+    out = bytearray()
+    end = len(delta)
+    while pos < end:
+        op = delta[pos]
+        pos += 1
+        if op & 0x80:
+            # Copy from base: offset/size bytes are present per flag bit
+            offset = size = 0
+            for i in range(4):
+                if op & (1 << i):
+                    offset |= delta[pos] << (8 * i)
+                    pos += 1
+            for i in range(3):
+                if op & (0x10 << i):
+                    size |= delta[pos] << (8 * i)
+                    pos += 1
+            if size == 0:
+                size = 0x10000
+            out += base[offset:offset + size]
+        elif op:
+            out += delta[pos:pos + op]
+            pos += op
+        else:
+            raise GitObjectError("Bad delta opcode")
+
+    if len(out) != dst_size:
+        raise GitObjectError("Delta result size mismatch")
+    return bytes(out)
+
+
+def _inflate(buf, pos, size):
+    # Decompress one zlib stream starting at buf[pos]; size is the expected output.
+    d = zlib.decompressobj()
+    out = []
+    got = 0
+    chunk = max(4096, size + 64)
+    while not d.eof:
+        data = buf[pos:pos + chunk]
+        if not data:
+            raise GitObjectError("Truncated pack entry")
+        pos += len(data)
+        piece = d.decompress(data)
+        out.append(piece)
+        got += len(piece)
+        chunk = 65536
+    result = b''.join(out)
+    if got != size:
+        raise GitObjectError("Pack entry size mismatch")
+    return result
+
+
+class PackIndex:
+    """A pack's .idx (version 2): fanout table + sorted object names."""
+
+    def __init__(self, idx_path):
+        self.idx_path = idx_path
+        self.pack_path = idx_path[:-4] + '.pack'
+        with open(idx_path, 'rb') as f:
+            self._idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._idx[:4] != b'\xfftOc' or struct.unpack('>I', self._idx[4:8])[0] != 2:
+            self._idx.close()
+            raise GitObjectError(f"Unsupported pack index: {idx_path}")
+        self.fanout = struct.unpack('>256I', self._idx[8:8 + 1024])
+        self.count = self.fanout[255]
+        self._names = 8 + 1024
+        self._offsets = self._names + self.count * 20 + self.count * 4
+        self._large = self._offsets + self.count * 4
+        self._pack = None
+
+    def find(self, sha):
+        # Binary-search the name table inside this first byte's fanout bucket.
+        first = sha[0]
+        lo = self.fanout[first - 1] if first else 0
+        hi = self.fanout[first]
+        idx = self._idx
+        base = self._names
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if idx[base + mid * 20:base + mid * 20 + 20] < sha:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.fanout[first] or idx[base + lo * 20:base + lo * 20 + 20] != sha:
+            return None
+        i = lo
+        offset = struct.unpack('>I', idx[self._offsets + i * 4:self._offsets + i * 4 + 4])[0]
+        if offset & 0x80000000:
+            j = offset & 0x7fffffff
+            offset = struct.unpack('>Q', idx[self._large + j * 8:self._large + j * 8 + 8])[0]
+        return offset
+
+    def pack(self):
+        if self._pack is None:
+            with open(self.pack_path, 'rb') as f:
+                self._pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._pack
+
+    def close(self):
+        if self._pack is not None:
+            self._pack.close()
+            self._pack = None
+        self._idx.close()
+
+
+class GitRepository:
+    """Read-only view of one repository's refs and objects."""
+
+    def __init__(self, git_dir):
+        self.git_dir = git_dir
+        self.common_dir = get_common_dir(git_dir)
+        self.object_dirs = self._object_dirs(os.path.join(self.common_dir, 'objects'))
+        self._packed_refs = None
+        self._packed_refs_key = None
+        self._packs = []
+        self._packs_key = None
+
+    def _object_dirs(self, objects):
+        dirs = [objects]
+        # objects/info/alternates lists extra object stores, one per line
+        try:
+            with open(os.path.join(objects, 'info', 'alternates'), 'r') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        dirs.append(os.path.normpath(os.path.join(objects, line)))
+        except OSError:
+            pass
+        return dirs
+
+    # --- refs ---
+
+    def packed_refs(self):
+        path = os.path.join(self.common_dir, 'packed-refs')
+        key = stat_key(path)
+        if self._packed_refs is None or key != self._packed_refs_key:
+            refs = {}
+            if key is not None:
+                with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                    for line in f:
+                        if line.startswith(('#', '^')):
+                            continue  # header / peeled tag line
+                        parts = line.split()
+                        if len(parts) == 2:
+                            refs[parts[1]] = parts[0]
+            self._packed_refs = refs
+            self._packed_refs_key = key
+        return self._packed_refs
+
+    def read_ref(self, name):
+        # Resolve a ref (e.g. "HEAD", "refs/heads/main") to a hex sha, or None if unborn.
+        if os.path.isdir(os.path.join(self.common_dir, 'reftable')):
+            raise GitObjectError("reftable ref storage is not supported")
+        for _ in range(MAX_SYMREF_DEPTH):
+            # HEAD and other per-worktree refs live in git_dir, the rest in common_dir
+            base = self.git_dir if '/' not in name else self.common_dir
+            try:
+                with open(os.path.join(base, name), 'r') as f:
+                    value = f.read().strip()
+            except (FileNotFoundError, NotADirectoryError, IsADirectoryError):
+                value = self.packed_refs().get(name)
+                if value is None:
+                    return None
+            if value.startswith('ref:'):
+                name = value[4:].strip()
+                continue
+            if len(value) != 40:
+                raise GitObjectError(f"Unsupported ref value for {name}: {value!r}")
+            return value
+        raise GitObjectError(f"Symbolic ref loop at {name}")
+
+    def resolve_head(self):
+        return self.read_ref('HEAD')
+
+    # --- objects ---
+
+    def pack_indexes(self, rescan=False):
+        key = tuple(stat_key(os.path.join(d, 'pack')) for d in self.object_dirs)
+        if rescan or key != self._packs_key:
+            known = {p.idx_path: p for p in self._packs}
+            packs = []
+            for objects in self.object_dirs:
+                pack_dir = os.path.join(objects, 'pack')
+                try:
+                    names = sorted(os.listdir(pack_dir))
+                except OSError:
+                    continue
+                for name in names:
+                    if not name.endswith('.idx'):
+                        continue
+                    path = os.path.join(pack_dir, name)
+                    index = known.pop(path, None)
+                    if index is None:
+                        try:
+                            index = PackIndex(path)
+                        except (OSError, ValueError, GitObjectError):
+                            continue  # half-written pack, pick it up next time
+                    packs.append(index)
+            for stale in known.values():
+                stale.close()
+            self._packs = packs
+            self._packs_key = key
+        return self._packs
+
+    def _read_loose(self, hex_sha):
+        for objects in self.object_dirs:
+            path = os.path.join(objects, hex_sha[:2], hex_sha[2:])
+            try:
+                with open(path, 'rb') as f:
+                    data = zlib.decompress(f.read())
+            except FileNotFoundError:
+                continue
+            header, _, body = data.partition(b'\0')
+            obj_type, _, size = header.partition(b' ')
+            if int(size) != len(body):
+                raise GitObjectError(f"Loose object {hex_sha} is truncated")
+            return obj_type.decode('ascii'), body
+        return None
+
+    def _read_packed(self, sha):
+        for index in self.pack_indexes():
+            offset = index.find(sha)
+            if offset is not None:
+                return self._unpack(index, offset)
+        return None
+
+    def _unpack(self, index, offset):
+        # Follow delta chains from offset down to a full object, then replay them.
+        pack = index.pack()
+        deltas = []
+        for _ in range(MAX_DELTA_DEPTH):
+            pos = offset
+            byte = pack[pos]
+            pos += 1
+            obj_type = (byte >> 4) & 7
+            size = byte & 0x0f
+            shift = 4
+            while byte & 0x80:
+                byte = pack[pos]
+                pos += 1
+                size |= (byte & 0x7f) << shift
+                shift += 7
+
+            if obj_type == OBJ_OFS_DELTA:
+                byte = pack[pos]
+                pos += 1
+                rel = byte & 0x7f
+                while byte & 0x80:
+                    byte = pack[pos]
+                    pos += 1
+                    rel = ((rel + 1) << 7) | (byte & 0x7f)
+                deltas.append(_inflate(pack, pos, size))
+                offset -= rel
+            elif obj_type == OBJ_REF_DELTA:
+                base_sha = bytes(pack[pos:pos + 20])
+                deltas.append(_inflate(pack, pos + 20, size))
+                base_type, data = self.read_object(base_sha.hex())
+                break
+            elif obj_type in TYPE_NAMES:
+                base_type, data = TYPE_NAMES[obj_type], _inflate(pack, pos, size)
+                break
+            else:
+                raise GitObjectError(f"Unknown pack object type {obj_type}")
+        else:
+            raise GitObjectError("Delta chain too deep")
+
+        for delta in reversed(deltas):
+            data = _apply_delta(data, delta)
+        return base_type, data
+
+    def read_object(self, hex_sha):
+        # (type name, raw body) for an object id; raises GitObjectError if not found.
+        try:
+            found = self._read_loose(hex_sha)
+            if found is None:
+                sha = bytes.fromhex(hex_sha)
+                found = self._read_packed(sha)
+                if found is None and self.pack_indexes(rescan=True):
+                    # A gc/repack may have just moved it into a new pack
+                    found = self._read_packed(sha)
+        except (zlib.error, struct.error, IndexError, ValueError) as e:
+            raise GitObjectError(f"Can't read object {hex_sha}: {e}") from e
+        if found is None:
+            raise GitObjectError(f"Object {hex_sha} not found")
+        return found
+
+    def read_commit(self, hex_sha):
+        obj_type, body = self.read_object(hex_sha)
+        if obj_type != 'commit':
+            raise GitObjectError(f"{hex_sha} is a {obj_type}, not a commit")
+        return parse_commit(body)
+
+    def close(self):
+        for index in self._packs:
+            index.close()
+        self._packs = []
+        self._packs_key = None
+
+
+_repositories = {}
+
+
+def open_repository(path=None):
+    # Cached GitRepository for the repo containing path (default: cwd), or None.
+    git_dir = find_git_dir(path)
+    if git_dir is None or not os.path.isfile(os.path.join(git_dir, 'HEAD')):
+        return None
+    repo = _repositories.get(git_dir)
+    if repo is None:
+        repo = _repositories[git_dir] = GitRepository(git_dir)
+    return repo
+
+
+def commit_fields(sha, commit, fields, now=None):
+    # query_head-compatible string values for a parsed commit.
+    now = time.time() if now is None else now
+    values = {
+        'sha': sha,
+        'message': commit['subject'],
+        'author': commit['author'],
+        'author_email': commit['author_email'],
+        'time_ago': format_relative_time(now - commit['author_time']),
+        'timestamp': str(commit['commit_time']),
+        'author_timestamp': str(commit['author_time']),
+        'parents': ' '.join(commit['parents']),
+    }
+    return {name: values[name] for name in fields}
+
+
+def head_fields(repo, fields, now=None):
+    # commit_fields() for the HEAD commit, or None if the branch is unborn.
+    sha = repo.resolve_head()
+    if sha is None:
+        return None
+    return commit_fields(sha, repo.read_commit(sha), fields, now)
@@ -1,32 +1,227 @@
 import subprocess
 from datetime import datetime
 import os
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+
+from git_reader import (
+    GitObjectError,
+    commit_fields,
+    find_git_dir,
+    get_common_dir,
+    head_fields,
+    open_repository,
+    parse_commit,
+    stat_key,
+)
+
+# query_head field name -> git log placeholder
+HEAD_FIELDS = {
+    'sha': '%H',
+    'message': '%s',
+    'author': '%an',
+    'author_email': '%ae',
+    'time_ago': '%ar',
+    'timestamp': '%ct',
+    'author_timestamp': '%at',
+    'parents': '%P',
+}
+
+COMMIT_INFO_FIELDS = ('message', 'author', 'time_ago')
+
+
+def query_head(fields=COMMIT_INFO_FIELDS, path=None, timeout=None):
+    # Fetch several fields of the HEAD commit of the repo at path (default: cwd).
+    # Reads .git directly when it can, then asks the session's cat-file process
+    # (cwd only), and only then runs `git log` (given up after timeout seconds).
+    fields = tuple(fields)
+    unknown = [name for name in fields if name not in HEAD_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown commit field: {unknown[0]}")
+    if find_git_dir(path) is None:
+        return None
 
-def get_last_commit_time():
-    # Get timestamp of last git commit in current repo.
     try:
-        # Get latest Git commits 
+        return _head_from_reader(fields, path)
+    except (GitObjectError, OSError):
+        pass
+    if path is None:
+        try:
+            return _head_from_batch(fields)
+        except (GitObjectError, OSError):
+            pass
+    return _head_from_cli(fields, path, timeout)
+
+
+def _head_from_reader(fields, path=None):
+    repo = open_repository(path)
+    if repo is None:
+        raise GitObjectError("Not inside a git repository")
+    return head_fields(repo, fields)
+
+
+def _head_from_batch(fields):
+    found = cat_file().read('HEAD')
+    if found is None:
+        return None  # unborn branch
+    sha, obj_type, body = found
+    if obj_type != 'commit':
+        raise GitObjectError(f"HEAD is a {obj_type}")
+    return commit_fields(sha, parse_commit(body), fields)
+
+
+def _head_from_cli(fields, path=None, timeout=None):
+    fmt = '%x00'.join(HEAD_FIELDS[name] for name in fields)
+    try:
         result = subprocess.run(
-            ['git', 'log', '-1', '--format=%ct'],
+            ['git', 'log', '-1', f'--format={fmt}'],
             capture_output=True,
             text=True,
-            check=True
+            errors='replace',
+            check=True,
+            cwd=path,
+            timeout=timeout
         )
-        
-        if result.stdout.strip():
-            timestamp = int(result.stdout.strip())
-            return datetime.fromtimestamp(timestamp)
-        else:
-            return None
-            
-    except subprocess.CalledProcessError:
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired, OSError):
         return None
-    except FileNotFoundError:
+
+    # Trailing newline belongs to git log, not to the last field
+    output = result.stdout[:-1] if result.stdout.endswith('\n') else result.stdout
+    values = output.split('\0')
+    if not output or len(values) != len(fields):
         return None
+    return dict(zip(fields, values))
+
+
+class CatFileBatch:
+    """
+    Long-lived `git cat-file --batch-check` / `--batch` processes, so object
+    lookups that need git itself don't pay for a fork each time.
+    Each process is started on first use and restarted if it dies.
+    """
+
+    def __init__(self, cwd=None):
+        self.cwd = cwd
+        self._procs = {}
+        self._lock = threading.Lock()
+
+    def _process(self, mode):
+        proc = self._procs.get(mode)
+        if proc is None or proc.poll() is not None:
+            try:
+                proc = subprocess.Popen(
+                    ['git', 'cat-file', f'--{mode}'],
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.DEVNULL,
+                    cwd=self.cwd
+                )
+            except OSError as e:
+                raise GitObjectError(f"Can't start git cat-file: {e}") from e
+            self._procs[mode] = proc
+        return proc
 
-def hours_since_last_commit():
+    def _stop(self, mode, timeout=1.0):
+        proc = self._procs.pop(mode, None)
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()  # EOF on stdin makes cat-file exit
+            proc.wait(timeout=timeout)
+        except (OSError, subprocess.TimeoutExpired):
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+    def _request(self, mode, rev):
+        if '\n' in rev:
+            raise ValueError("Revision can't contain a newline")
+        with self._lock:
+            for _ in range(2):
+                proc = self._process(mode)
+                try:
+                    proc.stdin.write(rev.encode('utf-8') + b'\n')
+                    proc.stdin.flush()
+                    header = proc.stdout.readline()
+                    if not header:
+                        raise BrokenPipeError("git cat-file exited")
+                    parts = header.split()
+                    if len(parts) != 3:
+                        return None  # "<rev> missing" / "<rev> ambiguous"
+                    sha, obj_type, size = parts[0].decode(), parts[1].decode(), int(parts[2])
+                    body = None
+                    if mode == 'batch':
+                        body = proc.stdout.read(size)
+                        proc.stdout.read(1)  # trailing newline
+                        if len(body) != size:
+                            raise BrokenPipeError("git cat-file exited mid-object")
+                    return sha, obj_type, size, body
+                except (OSError, ValueError):
+                    # Dead or confused process: restart it once and retry
+                    self._stop(mode, timeout=0)
+            raise GitObjectError(f"git cat-file failed for {rev}")
+
+    def check(self, rev):
+        # (sha, type, size) for a revision, or None if it doesn't exist.
+        found = self._request('batch-check', rev)
+        return found[:3] if found else None
+
+    def read(self, rev):
+        # (sha, type, raw body) for a revision, or None if it doesn't exist.
+        found = self._request('batch', rev)
+        return (found[0], found[1], found[3]) if found else None
+
+    def close(self):
+        with self._lock:
+            for mode in list(self._procs):
+                self._stop(mode)
+
+
+_cat_file = None
+
+
+def cat_file():
+    # Shared CatFileBatch for this session.
+    global _cat_file
+    if _cat_file is None:
+        _cat_file = CatFileBatch()
+    return _cat_file
+
+
+def close_cat_file():
+    # Shut down the session's cat-file processes (safe to call more than once).
+    global _cat_file
+    if _cat_file is not None:
+        _cat_file.close()
+        _cat_file = None
+
+
+def read_commit(rev):
+    # Parsed commit for a sha/rev: .git reader first, cat-file as fallback.
+    repo = open_repository()
+    if repo is not None and len(rev) == 40:
+        try:
+            return repo.read_commit(rev)
+        except (GitObjectError, OSError):
+            pass
+    found = cat_file().read(rev)
+    if found is None or found[1] != 'commit':
+        return None
+    return parse_commit(found[2])
+
+
+def get_last_commit_time(path=None):
+    # Get timestamp of last git commit in the repo at path (default: current repo).
+    head = query_head(('timestamp',), path=path)
+    if head is None or not head['timestamp'].strip():
+        return None
+    return datetime.fromtimestamp(int(head['timestamp']))
+
+def hours_since_last_commit(path=None):
     # Calculate hours since last commit.
-    last_commit = get_last_commit_time()
+    last_commit = get_last_commit_time(path)
     
     if last_commit is None:
         return 0.0
@@ -37,65 +232,35 @@ def hours_since_last_commit():
     
     return max(0, hours)  # Never negative
 
-def get_total_commits():
+def get_total_commits(path=None, timeout=None):
     # Get total number of commits in repo.
     try:
         result = subprocess.run(
             ['git', 'rev-list', '--count', 'HEAD'],
             capture_output=True,
             text=True,
-            check=True
+            check=True,
+            cwd=path,
+            timeout=timeout
         )
         return int(result.stdout.strip())
     except:
         return 0
 
-def is_git_repo():
-    # Check if current directory is a git repository
-    try:
-        subprocess.run(
-            ['git', 'rev-parse', '--git-dir'],
-            capture_output=True,
-            check=True
-        )
-        return True
-    except:
-        return False
+def is_git_repo(path=None):
+    # Check if current directory (or path) is a git repository (no subprocess needed)
+    return find_git_dir(path) is not None
 
-def get_commit_info():
+def get_commit_info(path=None):
     # Get detailed info about last commit.
-    try:
-        # Commit message
-        message_result = subprocess.run(
-            ['git', 'log', '-1', '--format=%s'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Author
-        author_result = subprocess.run(
-            ['git', 'log', '-1', '--format=%an'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Get date
-        date_result = subprocess.run(
-            ['git', 'log', '-1', '--format=%ar'],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        return {
-            'message': message_result.stdout.strip(),
-            'author': author_result.stdout.strip(),
-            'time_ago': date_result.stdout.strip()
-        }
-    except:
+    head = query_head(COMMIT_INFO_FIELDS, path=path)
+    if head is None:
         return None
+    return {
+        'message': head['message'].strip(),
+        'author': head['author'].strip(),
+        'time_ago': head['time_ago'].strip()
+    }
 
 
 def get_git_graph(max_lines=8):
@@ -114,3 +279,187 @@ def get_git_graph(max_lines=8):
         return None
     except:
         return None
+
+
+class RefFingerprint:
+    """Cheap stat-only fingerprint of HEAD, loose refs and packed-refs."""
+
+    def __init__(self, git_dir):
+        self.git_dir = git_dir
+        self.common_dir = get_common_dir(git_dir)
+        self._head = os.path.join(git_dir, 'HEAD')
+        self._packed = os.path.join(self.common_dir, 'packed-refs')
+        # refs dir -> stat key. Git updates refs by renaming "<ref>.lock" over
+        # the ref, which bumps the parent directory's mtime, so stat-ing the
+        # directories is enough; they are only re-listed when they change.
+        self._dirs = {}
+        self._scan(os.path.join(self.common_dir, 'refs'))
+
+    def _scan(self, root):
+        self._dirs[root] = stat_key(root)
+        try:
+            entries = list(os.scandir(root))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                self._scan(entry.path)
+
+    def current(self):
+        changed = [path for path, key in self._dirs.items() if stat_key(path) != key]
+        for path in changed:
+            # Drop the subtree and re-list it to pick up new or removed dirs
+            for known in [d for d in self._dirs if d == path or d.startswith(path + os.sep)]:
+                del self._dirs[known]
+            if os.path.isdir(path):
+                self._scan(path)
+        return (stat_key(self._head), stat_key(self._packed),
+                tuple(sorted(self._dirs.items())))
+
+
+class GitSnapshot:
+    """
+    Last git view data, only refreshed when HEAD, refs or packed-refs move.
+    hits/misses count cached reads vs. reads that had to run git.
+    """
+
+    def __init__(self, graph_lines=6, max_age=60.0):
+        self.graph_lines = graph_lines
+        # Relative dates ("5 minutes ago") still age while refs are idle
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._git_dir = find_git_dir()
+        self._fingerprint = RefFingerprint(self._git_dir) if self._git_dir else None
+        self._signature = None
+        self._fetched_at = 0.0
+        self._views = {}
+
+    def invalidate(self):
+        # Force the next get() to run git again
+        self._views = {}
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def get(self, graph=False):
+        # git_info dict for the display; shared between calls, don't mutate it.
+        signature = self._fingerprint.current() if self._fingerprint else None
+        now = time.monotonic()
+        if signature != self._signature or (
+                self.max_age is not None and now - self._fetched_at >= self.max_age):
+            self._views = {}
+            self._signature = signature
+            self._fetched_at = now
+
+        info = self._views.get(graph)
+        if info is not None:
+            self.hits += 1
+            return info
+
+        self.misses += 1
+        base = self._views.get(False)
+        if base is None:
+            base = get_commit_info() or {}
+            base['total'] = get_total_commits()
+            self._views[False] = base
+        if graph:
+            info = dict(base)
+            info['graph'] = get_git_graph(max_lines=self.graph_lines)
+            self._views[True] = info
+            return info
+        return base
+
+
+def with_repos(info, repos):
+    # Copy of git_info with the other repos' statuses (polls them)
+    info = dict(info)
+    info['repos'] = repos.poll()
+    info['repos_active'] = repos.active()
+    return info
+
+
+class GitState(namedtuple('GitState', 'info fetched_at refreshing', defaults=(None, None, True))):
+    """
+    Immutable git data published by GitPoller.
+    info: read-only git_info for the display (None until the first fetch),
+    fetched_at: time.time() when info was fetched,
+    refreshing: a refresh is pending or running.
+    """
+    __slots__ = ()
+
+    def age(self, now=None):
+        # Seconds since info was fetched (None if never)
+        if self.fetched_at is None:
+            return None
+        return (time.time() if now is None else now) - self.fetched_at
+
+
+class GitPoller:
+    """
+    Refreshes git data on a background thread, on a timer or on demand, and
+    publishes it as a GitState. latest() never blocks, so a slow git call
+    can't freeze input or animation.
+    """
+
+    def __init__(self, interval=5.0, graph_lines=6, repos=None):
+        self.interval = interval
+        self.on_update = None  # called with the new GitState from the poller thread
+        self.repos = repos     # MultiRepoTracker for the other repos, if any
+        self._snapshot = GitSnapshot(graph_lines=graph_lines)
+        self._graph = False
+        self._state = GitState()
+        self._publish_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="git-poller", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=1.0):
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def latest(self):
+        return self._state
+
+    def request_refresh(self, graph=None):
+        # Ask for a refresh soon; graph=True/False also switches whether the graph is fetched
+        if graph is not None:
+            self._graph = graph
+        self._publish(refreshing=True)
+        self._wake.set()
+
+    def _publish(self, **changes):
+        with self._publish_lock:
+            new_state = self._state._replace(**changes)
+            if new_state == self._state:
+                return
+            self._state = new_state
+        if self.on_update:
+            self.on_update(new_state)
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.clear()
+            try:
+                info = self._snapshot.get(graph=self._graph)
+                if self.repos is not None:
+                    info = with_repos(info, self.repos)
+            except Exception:
+                info = None
+            state = self._state
+            if info is None:
+                self._publish(refreshing=False)
+            elif state.info is not None and state.info == info:
+                # Nothing moved; keep the published object so readers see no change
+                self._publish(refreshing=False)
+            else:
+                self._publish(info=MappingProxyType(info), fetched_at=time.time(), refreshing=False)
+            self._wake.wait(self.interval)
@@ -0,0 +1,275 @@
+import ctypes
+import ctypes.util
+import os
+import selectors
+import struct
+import sys
+import threading
+import time
+
+from git_reader import get_common_dir
+from git_tracker import RefFingerprint
+
+# Watches HEAD, refs/** and packed-refs of one or more repos and calls
+# on_change() when they move: inotify on Linux, stat polling elsewhere.
+# A burst of ref updates (rebase, fetch) is reported as one change.
+
+# "auto" (inotify if available), "inotify" or "poll"
+WATCH_BACKEND = os.environ.get("DEVGOTCHI_GIT_WATCH", "auto")
+# Report a burst once it has been quiet this long...
+COALESCE_DELAY = 0.1
+# ...or once it has gone on this long
+MAX_COALESCE = 1.0
+# Seconds between stat checks when polling
+POLL_INTERVAL = 1.0
+
+# Files in the git dir whose changes matter; everything under refs/ does
+TOP_FILES = {b'HEAD', b'packed-refs'}
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_EVENT = struct.Struct('iIII')   # wd, mask, cookie, name length
+
+TOP_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+REFS_MASK = (IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+             | IN_DELETE_SELF | IN_ONLYDIR)
+
+
+def _load_libc():
+    # libc with inotify, or None (not Linux, or no usable libc)
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+class Inotify:
+    """Minimal inotify binding: one fd, add_watch(), and read() of (wd, mask, name) events."""
+
+    def __init__(self, libc):
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def add_watch(self, path, mask):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        return wd
+
+    def read(self):
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        events = []
+        pos = 0
+        while pos + INOTIFY_EVENT.size <= len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, pos)
+            pos += INOTIFY_EVENT.size
+            events.append((wd, mask, data[pos:pos + length].rstrip(b'\0')))
+            pos += length
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+
+class GitWatcher:
+    """
+    Calls on_change() from a background thread when HEAD, a ref or
+    packed-refs changes in any of git_dirs. Changes closer together than
+    COALESCE_DELAY are reported once (at most MAX_COALESCE after the first).
+    changes counts reports; events counts the raw changes behind them.
+    """
+
+    def __init__(self, git_dirs, on_change, backend=WATCH_BACKEND, delay=COALESCE_DELAY,
+                 max_delay=MAX_COALESCE, poll_interval=POLL_INTERVAL):
+        self.git_dirs = list(git_dirs)
+        self.on_change = on_change
+        self.backend = backend
+        self.delay = delay
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.changes = 0
+        self.events = 0
+        self._inotify = None
+        self._watches = {}        # wd -> (path, is the refs tree)
+        self._fingerprints = None
+        self._signatures = None
+        self._thread = None
+        self._wakeup = None
+
+    # --- inotify ---
+
+    def _start_inotify(self):
+        libc = _load_libc()
+        if libc is None:
+            return False
+        try:
+            self._inotify = Inotify(libc)
+            for git_dir in self.git_dirs:
+                common_dir = get_common_dir(git_dir)
+                for top in {git_dir, common_dir}:
+                    self._watch(top, refs=False)
+                self._watch_tree(os.path.join(common_dir, 'refs'))
+        except OSError:
+            # e.g. out of watches (fs.inotify.max_user_watches)
+            if self._inotify is not None:
+                self._inotify.close()
+            self._inotify = None
+            self._watches = {}
+            return False
+        return True
+
+    def _watch(self, path, refs):
+        wd = self._inotify.add_watch(path, REFS_MASK if refs else TOP_MASK)
+        self._watches[wd] = (path, refs)
+
+    def _watch_tree(self, root):
+        self._watch(root, refs=True)
+        for dirpath, dirnames, _ in os.walk(root):
+            for name in dirnames:
+                self._watch(os.path.join(dirpath, name), refs=True)
+
+    def _read_inotify(self):
+        # True if any event touched a ref
+        changed = False
+        for wd, mask, name in self._inotify.read():
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: assume a change and re-add the tree in case dirs appeared
+                changed = True
+                for git_dir in self.git_dirs:
+                    self._try_watch_tree(os.path.join(get_common_dir(git_dir), 'refs'))
+                continue
+            if mask & IN_IGNORED:
+                self._watches.pop(wd, None)
+                continue
+            watched = self._watches.get(wd)
+            if watched is None:
+                continue
+            path, refs = watched
+            if not refs:
+                changed = changed or name in TOP_FILES
+                continue
+            if name.endswith(b'.lock'):
+                continue
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # New refs directory (e.g. refs/heads/feature/): watch it and everything already in it
+                self._try_watch_tree(os.path.join(path, os.fsdecode(name)))
+            changed = True
+        return changed
+
+    def _try_watch_tree(self, root):
+        try:
+            self._watch_tree(root)
+        except OSError:
+            pass
+
+    # --- polling ---
+
+    def _start_polling(self):
+        self._fingerprints = [RefFingerprint(git_dir) for git_dir in self.git_dirs]
+        self._signatures = [fingerprint.current() for fingerprint in self._fingerprints]
+
+    def _poll(self):
+        signatures = [fingerprint.current() for fingerprint in self._fingerprints]
+        changed = signatures != self._signatures
+        self._signatures = signatures
+        return changed
+
+    # --- thread ---
+
+    @property
+    def active_backend(self):
+        # "inotify" or "poll" once started, else None
+        if self._thread is None:
+            return None
+        return "inotify" if self._inotify is not None else "poll"
+
+    def start(self):
+        if self._thread is not None or not self.git_dirs:
+            return
+        if self.backend == "poll" or not self._start_inotify():
+            self._start_polling()
+        self._wakeup = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="git-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        try:
+            os.write(self._wakeup[1], b'x')
+        except OSError:
+            pass
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        for fd in self._wakeup:
+            os.close(fd)
+        self._wakeup = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+            self._watches = {}
+
+    def _run(self):
+        first_change = None   # monotonic time of the first change not reported yet
+        last_change = None
+        next_poll = time.monotonic() + self.poll_interval
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._wakeup[0], selectors.EVENT_READ)
+            if self._inotify is not None:
+                selector.register(self._inotify.fd, selectors.EVENT_READ)
+            while True:
+                deadlines = []
+                if first_change is not None:
+                    deadlines.append(min(last_change + self.delay, first_change + self.max_delay))
+                if self._inotify is None:
+                    deadlines.append(next_poll)
+                timeout = max(0.0, min(deadlines) - time.monotonic()) if deadlines else None
+
+                changed = False
+                for key, _ in selector.select(timeout):
+                    if key.fd == self._wakeup[0]:
+                        return
+                    changed = self._read_inotify() or changed
+                now = time.monotonic()
+                if self._inotify is None and now >= next_poll:
+                    changed = self._poll() or changed
+                    next_poll = now + self.poll_interval
+
+                if changed:
+                    self.events += 1
+                    last_change = now
+                    if first_change is None:
+                        first_change = now
+                if first_change is not None and now >= min(last_change + self.delay, first_change + self.max_delay):
+                    first_change = None
+                    self.changes += 1
+                    try:
+                        self.on_change()
+                    except Exception:
+                        pass
@@ -0,0 +1,85 @@
+import random
+from collections import OrderedDict
+
+GLITCH_CHARS = ['?', '█', '▓', '░', '*', '#']
+
+# Below this corruption level text is never corrupted
+MIN_CORRUPTION = 20
+
+
+def _corruptible_positions(text):
+    return [i for i, char in enumerate(text) if char != ' ' and char != '\n']
+
+
+def corrupt_with(rng, text, corruption_level, positions=None):
+    # One corrupted copy of text: each non-space char has a corruption_level/200
+    # chance of turning into a glitch glyph.
+    if corruption_level < MIN_CORRUPTION:
+        return text
+    if positions is None:
+        positions = _corruptible_positions(text)
+    p = min(1.0, corruption_level / 200)
+    count = rng.binomialvariate(len(positions), p) if positions else 0
+    if not count:
+        return text
+
+    # Glyph per distinct character for this copy, applied with str.translate,
+    # then spliced in only at the masked positions
+    noise = text.translate({ord(char): rng.choice(GLITCH_CHARS) for char in set(text) - {' ', '\n'}})
+    chars = list(text)
+    for i in rng.sample(positions, count):
+        chars[i] = noise[i]
+    return ''.join(chars)
+
+
+class GlitchEngine:
+    """
+    Pre-corrupted variants of sprite frames, banked per corruption bucket so
+    a glitch frame is a random pick instead of a per-character pass.
+    Banks are kept in an LRU, so moving to a new corruption level evicts the
+    least recently used ones. Pass a seed for reproducible output.
+    """
+
+    def __init__(self, variants=8, bucket_size=10, max_banks=32, seed=None):
+        self.variants = variants
+        self.bucket_size = bucket_size
+        self.max_banks = max_banks
+        self.rng = random.Random(seed)
+        self._banks = OrderedDict()
+        self._positions = {}
+
+    def seed(self, seed):
+        self.rng.seed(seed)
+        self._banks.clear()
+
+    def bucket(self, corruption_level):
+        return int(max(0, min(100, corruption_level))) // self.bucket_size
+
+    def bank(self, text, corruption_level):
+        # The bank of variants for this frame at this corruption level
+        key = (text, self.bucket(corruption_level))
+        bank = self._banks.get(key)
+        if bank is not None:
+            self._banks.move_to_end(key)
+            return bank
+
+        # Every level in a bucket uses the bucket's midpoint
+        level = min(100, key[1] * self.bucket_size + self.bucket_size / 2)
+        positions = self._positions.get(text)
+        if positions is None:
+            positions = self._positions[text] = _corruptible_positions(text)
+        bank = tuple(corrupt_with(self.rng, text, level, positions) for _ in range(self.variants))
+
+        self._banks[key] = bank
+        while len(self._banks) > self.max_banks:
+            old_text, _ = self._banks.popitem(last=False)[0]
+            if not any(t == old_text for t, _ in self._banks):
+                self._positions.pop(old_text, None)
+        return bank
+
+    def should_glitch(self, corruption_level):
+        # Higher corruption = higher chance of glitch: 0% at 50, 33% at 100
+        return corruption_level > 50 and self.rng.random() < (corruption_level - 50) / 150
+
+    def variant(self, text, corruption_level):
+        return self.rng.choice(self.bank(text, corruption_level))
@@ -0,0 +1,48 @@
+import threading
+from collections import deque
+
+# Keys whose back-to-back repeats merge into one event with a count
+REPEATABLE_KEYS = frozenset({'UP', 'DOWN', 'LEFT', 'RIGHT'})
+
+
+class InputQueue:
+    """
+    Thread-safe FIFO of key events, so no key press is lost between frames.
+    Events are (key, count) pairs; a held arrow key becomes one event with a
+    count instead of one event per repeat. on_put is called after every put
+    (the game passes RenderScheduler.wake).
+    """
+
+    def __init__(self, on_put=None):
+        self.on_put = on_put
+        self._cond = threading.Condition()
+        self._events = deque()
+
+    def __len__(self):
+        with self._cond:
+            return len(self._events)
+
+    def put(self, key):
+        # Safe to call from any thread
+        with self._cond:
+            if key in REPEATABLE_KEYS and self._events and self._events[-1][0] == key:
+                self._events[-1] = (key, self._events[-1][1] + 1)
+            else:
+                self._events.append((key, 1))
+            self._cond.notify()
+        if self.on_put:
+            self.on_put()
+
+    def get(self, timeout=None):
+        # Next (key, count), waiting up to timeout seconds (None = forever); None if nothing came
+        with self._cond:
+            if not self._events:
+                self._cond.wait_for(lambda: self._events, timeout)
+            return self._events.popleft() if self._events else None
+
+    def drain(self):
+        # Every queued event, oldest first, without waiting
+        with self._cond:
+            events = list(self._events)
+            self._events.clear()
+            return events
@@ -0,0 +1,167 @@
+import glob
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from git_reader import find_git_dir
+from git_tracker import RefFingerprint, query_head
+
+# Repos to watch besides the current one: paths or globs separated by
+# os.pathsep, e.g. DEVGOTCHI_REPOS="~/code/*:~/work/api"
+REPOS_ENV = "DEVGOTCHI_REPOS"
+# Repos queried at once
+MAX_WORKERS = 8
+# Longest a single repo may take before it's reported as timed out
+REPO_TIMEOUT = 2.0
+# Cached results are reused until refs move or they get this old (relative dates still age)
+MAX_AGE = 60.0
+# A repo with a commit this recent counts as active
+ACTIVE_HOURS = 24
+
+REPO_FIELDS = ('message', 'author', 'time_ago', 'timestamp')
+
+
+class RepoStatus(namedtuple('RepoStatus', 'name path info elapsed error')):
+    """
+    Last known state of one repo.
+    info: query_head() fields of HEAD (None if it couldn't be read),
+    elapsed: seconds the last query took,
+    error: None, "timeout" or a short reason.
+    """
+    __slots__ = ()
+
+    def commit_time(self):
+        # Unix time of the HEAD commit, or None
+        if not self.info or not self.info.get('timestamp', '').strip():
+            return None
+        return int(self.info['timestamp'])
+
+
+def expand_repos(patterns):
+    # Worktree paths for paths/globs, one per git dir, in the given order
+    paths = []
+    seen = set()
+    for pattern in patterns:
+        pattern = os.path.expanduser(pattern.strip())
+        if not pattern:
+            continue
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        for path in matches:
+            git_dir = find_git_dir(path) if os.path.isdir(path) else None
+            if git_dir is None or git_dir in seen:
+                continue
+            seen.add(git_dir)
+            paths.append(os.path.abspath(path))
+    return paths
+
+
+def repos_from_env():
+    # MultiRepoTracker for DEVGOTCHI_REPOS, or None if it's unset or matches nothing
+    spec = os.environ.get(REPOS_ENV)
+    if not spec:
+        return None
+    paths = expand_repos(spec.split(os.pathsep))
+    return MultiRepoTracker(paths) if paths else None
+
+
+def _query(path, timeout):
+    # (info, error) for one repo
+    try:
+        info = query_head(REPO_FIELDS, path=path, timeout=timeout)
+    except Exception as e:
+        return None, str(e) or type(e).__name__
+    if info is None:
+        return None, "no commits"
+    return {name: value.strip() for name, value in info.items()}, None
+
+
+class MultiRepoTracker:
+    """
+    HEAD commits of several repos, queried in parallel on a bounded thread
+    pool. A repo whose refs haven't moved is served from its cache; one
+    that is still running after its timeout is reported as timed out and
+    picked up by a later poll() once it finishes.
+    """
+
+    def __init__(self, paths, max_workers=MAX_WORKERS, timeout=REPO_TIMEOUT, max_age=MAX_AGE):
+        self.paths = list(paths)
+        self.timeout = timeout
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="repo")
+        self._workers = max_workers
+        self._lock = threading.Lock()
+        self._statuses = {path: RepoStatus(os.path.basename(path), path, None, None, None) for path in self.paths}
+        self._fingerprints = {}
+        self._fetched = {}      # path -> (signature, monotonic time) of the last completed query
+        self._running = {}      # path -> (future, signature, start time)
+
+    def _signature(self, path):
+        fingerprint = self._fingerprints.get(path)
+        if fingerprint is None:
+            git_dir = find_git_dir(path)
+            if git_dir is None:
+                return None
+            fingerprint = self._fingerprints[path] = RefFingerprint(git_dir)
+        return fingerprint.current()
+
+    def _timed_query(self, path):
+        start = time.perf_counter()
+        info, error = _query(path, self.timeout)
+        return info, error, time.perf_counter() - start
+
+    def poll(self):
+        """Refresh repos whose refs moved (or whose cache aged out); returns statuses, newest commit first"""
+        with self._lock:
+            now = time.monotonic()
+            for path in self.paths:
+                if path in self._running:
+                    continue
+                signature = self._signature(path)
+                fetched = self._fetched.get(path)
+                if fetched and fetched[0] == signature and now - fetched[1] < self.max_age:
+                    self.hits += 1
+                    continue
+                self.misses += 1
+                self._running[path] = (self._pool.submit(self._timed_query, path), signature, now)
+
+            if self._running:
+                # Repos wait for a free worker, so allow a timeout per batch of workers
+                batches = -(-len(self._running) // self._workers)
+                wait([future for future, _, _ in self._running.values()], timeout=self.timeout * batches)
+
+            for path, (future, signature, started) in list(self._running.items()):
+                status = self._statuses[path]
+                if future.done():
+                    del self._running[path]
+                    try:
+                        info, error, elapsed = future.result()
+                    except Exception as e:
+                        info, error, elapsed = None, str(e) or type(e).__name__, None
+                    self._statuses[path] = status._replace(info=info, elapsed=elapsed, error=error)
+                    self._fetched[path] = (signature, started)
+                elif status.error != "timeout":
+                    # Keep the last info; the result lands on a later poll
+                    self._statuses[path] = status._replace(elapsed=time.monotonic() - started, error="timeout")
+            return self.statuses()
+
+    def statuses(self):
+        # Last known status of every repo, newest commit first, without querying
+        return tuple(sorted(self._statuses.values(), key=lambda s: -(s.commit_time() or 0)))
+
+    def last_commit_time(self):
+        # Newest commit across all repos (unix time), or None
+        times = [t for t in (s.commit_time() for s in self._statuses.values()) if t is not None]
+        return max(times) if times else None
+
+    def active(self, now=None, hours=ACTIVE_HOURS):
+        # How many repos had a commit in the last `hours`
+        now = time.time() if now is None else now
+        return sum(1 for s in self._statuses.values()
+                   if s.commit_time() is not None and now - s.commit_time() < hours * 3600)
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,73 @@
+import time
+
+# Hours after a commit before the pet notices you're gone. Once the gap is
+# longer than this, the whole gap counts as neglect.
+GRACE_HOURS = 24
+
+
+def neglect_hours(t, last_commit, grace_hours=GRACE_HOURS):
+    """Decay hours owed at time t for the gap since last_commit (0 inside the grace period)"""
+    if last_commit is None:
+        return 0.0
+    gap = (t - last_commit) / 3600
+    return gap if gap > grace_hours else 0.0
+
+
+class DecayEngine:
+    """
+    Applies the pet's decay as time passes, exactly once per interval.
+
+    pet.decay_applied_until (saved with the pet) marks how far decay has
+    been applied. The decay owed between two times is the difference of
+    neglect_hours() at both ends, so catching up after months away costs
+    the same as a one-minute tick, and any split into ticks adds up to the
+    same total. Within a session time comes from the monotonic clock, so
+    wall clock jumps don't count as time away.
+    """
+
+    def __init__(self, pet, clock=time.monotonic):
+        self.pet = pet
+        self.last_commit = None   # unix time of the newest commit, None outside a repo
+        self.active_days = 0
+        self.ready = False        # nothing is applied until the commit activity is known
+        self._clock = clock
+        self._wall_start = time.time()
+        self._clock_start = clock()
+
+    def now(self):
+        # Session start on the wall clock plus monotonic time since
+        return self._wall_start + (self._clock() - self._clock_start)
+
+    def set_commit_activity(self, last_commit, active_days=0):
+        self.last_commit = last_commit
+        self.active_days = active_days
+        self.ready = True
+
+    def commit_gap(self, now=None):
+        # Hours since the last commit
+        if self.last_commit is None:
+            return 0.0
+        now = self.now() if now is None else now
+        return max(0.0, (now - self.last_commit) / 3600)
+
+    def pending_hours(self, now=None):
+        # Decay hours owed since decay_applied_until
+        if not self.ready:
+            return 0.0
+        now = self.now() if now is None else now
+        start = self.pet.decay_applied_until
+        if now <= start:
+            return 0.0
+        return neglect_hours(now, self.last_commit) - neglect_hours(start, self.last_commit)
+
+    def advance(self, now=None):
+        # Apply the decay owed up to now; returns the hours applied
+        if not self.ready:
+            return 0.0
+        now = self.now() if now is None else now
+        hours = self.pending_hours(now)
+        if now > self.pet.decay_applied_until:
+            self.pet.decay_applied_until = now
+        if hours > 0:
+            self.pet.decay_memory(hours, active_days=self.active_days)
+        return hours
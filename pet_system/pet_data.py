@@ -1,43 +1,187 @@
 import time
+from array import array
+from collections.abc import MutableMapping
+
+# Most interactions kept in the history
+HISTORY_LIMIT = 10000
+
+# Numeric stats live in one array('d') per pet, in this order
+STAT_FIELDS = (
+    "health", "happiness", "hunger", "age_hours",           # stats
+    "name_clarity", "bond_level", "interaction_count",      # pet_memory
+    "file_corruption", "art_quality",                       # player_memory
+)
+(HEALTH, HAPPINESS, HUNGER, AGE_HOURS,
+ NAME_CLARITY, BOND_LEVEL, INTERACTION_COUNT,
+ FILE_CORRUPTION, ART_QUALITY) = range(len(STAT_FIELDS))
+# Stored as doubles but read back as ints
+INT_FIELDS = frozenset({INTERACTION_COUNT})
+
+# Save section -> key -> array index, or the slot holding a non-numeric value.
+# Key order is the order keys appear in saves.
+SECTION_FIELDS = {
+    "pet_memory": {
+        "owner_name": "_owner_name",
+        "name_clarity": NAME_CLARITY,
+        "bond_level": BOND_LEVEL,
+        "learned_tricks": "_learned_tricks",
+        "interaction_count": INTERACTION_COUNT,
+    },
+    "stats": {
+        "health": HEALTH,
+        "happiness": HAPPINESS,
+        "hunger": HUNGER,
+        "age_hours": AGE_HOURS,
+    },
+    "player_memory": {
+        "file_corruption": FILE_CORRUPTION,   # 0-100
+        "history_intact": "_history_intact",  # Command history
+        "art_quality": ART_QUALITY,           # ASCII art clarity
+    },
+}
+
+_DEFAULTS = array('d', [100, 100, 0, 0, 100, 100, 0, 0, 100])
+
+# Change per hour of decay (see Pet.decay_memory)
+NAME_CLARITY_DECAY = 5
+BOND_DECAY = 3
+FILE_CORRUPTION_GROWTH = 4
+# Boosts from feeding and playing (capped at 100)
+FEED_HAPPINESS = 15
+PLAY_BOND = 5
+
+
+class StatView(MutableMapping):
+    """
+    dict-like view of one section of a Pet (pet.stats, pet.pet_memory,
+    pet.player_memory). Reads and writes go straight to the pet; keys the
+    pet doesn't know are kept on the side so saves round-trip. Use
+    dict(view) where a real dict is needed, e.g. for json.
+    """
+
+    __slots__ = ("_pet", "_fields", "_section")
+
+    def __init__(self, pet, section):
+        self._pet = pet
+        self._section = section
+        self._fields = SECTION_FIELDS[section]
+
+    def _extra(self):
+        # Unknown keys of this section (read-only empty dict if there are none)
+        extra = self._pet._extra
+        return extra.get(self._section, {}) if extra else {}
+
+    def __getitem__(self, key):
+        field = self._fields.get(key)
+        if field is None:
+            return self._extra()[key]
+        if type(field) is int:
+            value = self._pet._values[field]
+            return int(value) if field in INT_FIELDS else value
+        return getattr(self._pet, field)
+
+    def __setitem__(self, key, value):
+        field = self._fields.get(key)
+        if field is None:
+            if self._pet._extra is None:
+                self._pet._extra = {}
+            self._pet._extra.setdefault(self._section, {})[key] = value
+        elif type(field) is int:
+            self._pet._values[field] = value
+        else:
+            setattr(self._pet, field, value)
+
+    def __delitem__(self, key):
+        if key in self._fields:
+            raise TypeError(f"Pet field {key!r} can't be removed")
+        del self._extra()[key]
+
+    def __iter__(self):
+        yield from self._fields
+        yield from list(self._extra())
+
+    def __len__(self):
+        return len(self._fields) + len(self._extra())
+
+    def __contains__(self, key):
+        return key in self._fields or key in self._extra()
+
+    def __repr__(self):
+        return repr(dict(self))
+
+
+def _section_property(section):
+    def get(self):
+        return StatView(self, section)
+
+    def set(self, values):
+        # Assigning a mapping updates the pet's fields from it
+        StatView(self, section).update(values)
+    return property(get, set)
+
+
+def _stat_property(index):
+    return property(lambda self: self._values[index],
+                    lambda self, value: self._values.__setitem__(index, value))
+
 
 class Pet:
     """Pet's Brain 🥹"""
+
+    __slots__ = (
+        "pet_name", "creation_time", "last_interaction", "last_commit",
+        "interaction_times", "decay_applied_until", "on_change",
+        "_values", "_owner_name", "_learned_tricks", "_history_intact", "_extra",
+    )
+
+    # Dict-like sections (see StatView), as in saves
+    pet_memory = _section_property("pet_memory")
+    stats = _section_property("stats")
+    player_memory = _section_property("player_memory")
+
+    # Typed access to the numbers the game reads every frame
+    health = _stat_property(HEALTH)
+    happiness = _stat_property(HAPPINESS)
+    name_clarity = _stat_property(NAME_CLARITY)
+    bond_level = _stat_property(BOND_LEVEL)
+    file_corruption = _stat_property(FILE_CORRUPTION)
     
     def __init__(self, owner_name="Friend", pet_name="Buddy"):
         self.pet_name = pet_name
         self.creation_time = time.time()
 
-        self.pet_memory = {
-            "owner_name": owner_name,
-            "name_clarity": 100,            
-            "bond_level": 100,              
-            "learned_tricks": [],           
-            "interaction_count": 0          
-        }
-        
-        # Pet's health stats
-        self.stats = {
-            "health": 100,
-            "happiness": 100,
-            "hunger": 0,
-            "age_hours": 0
-        }
+        # Every numeric stat, see STAT_FIELDS
+        self._values = array('d', _DEFAULTS)
+        self._extra = None
+
+        # Pet's memory of owner
+        self._owner_name = owner_name
+        self._learned_tricks = []
         
         # Time tracking for decay
         self.last_interaction = time.time()
         self.last_commit = time.time()
+        # When the owner fed or played with the pet, oldest first
+        self.interaction_times = []
+        # Decay has been applied up to this time (see pet_system.decay)
+        self.decay_applied_until = self.creation_time
         
         # YOUR memory of pet (file integrity)
-        self.player_memory = {
-            "file_corruption": 0,    # 0-100
-            "history_intact": True,  # Command history
-            "art_quality": 100       # ASCII art clarity
-        }
+        self._history_intact = True
+
+        # Called with an event name ("decay") when the pet changes itself
+        self.on_change = None
+
+    def levels(self):
+        """(happiness, bond, name clarity, file corruption) as ints, as the display shows them"""
+        values = self._values
+        return (int(values[HAPPINESS]), int(values[BOND_LEVEL]),
+                int(values[NAME_CLARITY]), int(values[FILE_CORRUPTION]))
     
     def get_display_name(self):
         """What the pet calls you (degrades with memory loss)"""
-        clarity = self.pet_memory["name_clarity"]
-        owner = self.pet_memory["owner_name"]
+        clarity = self._values[NAME_CLARITY]
+        owner = self._owner_name
         
         if clarity > 70:
             return owner
@@ -55,16 +199,44 @@ class Pet:
         else:
             return "???"
     
-    def decay_memory(self, hours_passed):
+    def record_interaction(self, now=None):
+        """Owner fed or played with the pet"""
+        now = time.time() if now is None else now
+        self.last_interaction = now
+        self._values[INTERACTION_COUNT] += 1
+        self.interaction_times.append(now)
+        if len(self.interaction_times) > HISTORY_LIMIT:
+            del self.interaction_times[:-HISTORY_LIMIT]
+
+    def feed(self, now=None):
+        """Owner fed the pet: happier"""
+        self._values[HAPPINESS] = min(100, self._values[HAPPINESS] + FEED_HAPPINESS)
+        self.record_interaction(now)
+
+    def play(self, now=None):
+        """Owner played with the pet: closer bond"""
+        self._values[BOND_LEVEL] = min(100, self._values[BOND_LEVEL] + PLAY_BOND)
+        self.record_interaction(now)
+
+    def decay_memory(self, hours_passed, active_days=0):
         """Memory loss over time :/ sad person"""
+        # A dev who committed on many of the last 30 days is trusted more:
+        # up to half the decay is forgiven.
+        hours_passed *= 1 - min(active_days, 30) / 60
+
+        values = self._values
+
         # Pet forgets you
-        self.pet_memory["name_clarity"] -= hours_passed * 5
-        self.pet_memory["bond_level"] -= hours_passed * 3
+        values[NAME_CLARITY] -= hours_passed * NAME_CLARITY_DECAY
+        values[BOND_LEVEL] -= hours_passed * BOND_DECAY
         
         # Your files corrupt
-        self.player_memory["file_corruption"] += hours_passed * 4
+        values[FILE_CORRUPTION] += hours_passed * FILE_CORRUPTION_GROWTH
         
         # Clamp values
-        self.pet_memory["name_clarity"] = max(0, self.pet_memory["name_clarity"])
-        self.pet_memory["bond_level"] = max(0, self.pet_memory["bond_level"])
-        self.player_memory["file_corruption"] = min(100, self.player_memory["file_corruption"])
+        values[NAME_CLARITY] = max(0, values[NAME_CLARITY])
+        values[BOND_LEVEL] = max(0, values[BOND_LEVEL])
+        values[FILE_CORRUPTION] = min(100, values[FILE_CORRUPTION])
+
+        if self.on_change:
+            self.on_change("decay")
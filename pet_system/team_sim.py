@@ -0,0 +1,190 @@
+from collections import namedtuple
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("pet_system.team_sim needs numpy (uv run --with numpy ...)") from None
+
+from pet_system.decay import GRACE_HOURS, DecayEngine
+from pet_system.pet_data import (
+    Pet, STAT_FIELDS, _DEFAULTS, HAPPINESS, NAME_CLARITY, BOND_LEVEL, INTERACTION_COUNT, FILE_CORRUPTION,
+    NAME_CLARITY_DECAY, BOND_DECAY, FILE_CORRUPTION_GROWTH, FEED_HAPPINESS, PLAY_BOND,
+)
+
+# Replays a team's commit and interaction history for many pets at once, one
+# row of NumPy arrays per pet, to try out decay settings across an org.
+# simulate_scalar() runs the same replay through real Pet objects; with the
+# default settings both give bit-for-bit the same stats.
+#
+# Time moves in steps. At the end of each step, in this order:
+#   1. commits in the step update each pet's last commit and active days
+#   2. decay owed since the previous step is applied (as DecayEngine does)
+#   3. feeds and plays in the step are applied
+# Active days are counted on UTC days (the game uses local days).
+
+FEED, PLAY, COMMIT = 0, 1, 2
+ACTIVE_WINDOW = 30   # days counted by active_days, as in the game
+
+Timeline = namedtuple('Timeline', 'times pets kinds')
+
+
+def make_timeline(times, pets, kinds):
+    """Timeline of events (unix time, pet row, FEED/PLAY/COMMIT), sorted by time"""
+    times = np.asarray(times, dtype=np.float64)
+    order = np.argsort(times, kind='stable')
+    return Timeline(times[order], np.asarray(pets, dtype=np.int64)[order], np.asarray(kinds, dtype=np.int8)[order])
+
+
+def step_times(start, end, step):
+    # End of each step: start + step, start + 2 * step, ..., end
+    k = 1
+    while start + k * step < end:
+        yield start + k * step
+        k += 1
+    yield end
+
+
+def _day(t):
+    return int(t // 86400)
+
+
+class TeamSim:
+    """
+    Stats of n pets as an (n, len(STAT_FIELDS)) float64 array laid out like
+    Pet's, plus each pet's last commit (NaN before the first) and last
+    interaction. Call run() with a Timeline to move it forward.
+    """
+
+    def __init__(self, n_pets, start, grace_hours=GRACE_HOURS,
+                 rates=(NAME_CLARITY_DECAY, BOND_DECAY, FILE_CORRUPTION_GROWTH)):
+        self.n_pets = n_pets
+        self.time = start
+        self.grace_hours = grace_hours
+        self.rates = rates
+        self.values = np.tile(np.frombuffer(_DEFAULTS, dtype=np.float64), (n_pets, 1))
+        self.last_commit = np.full(n_pets, np.nan)
+        self.last_interaction = np.full(n_pets, float(start))
+        self.active_days = np.zeros(n_pets, dtype=np.int64)
+        # Which of the last ACTIVE_WINDOW days had a commit, one column per day (day % ACTIVE_WINDOW)
+        self._commit_days = np.zeros((n_pets, ACTIVE_WINDOW), dtype=bool)
+        self._today = _day(start)
+
+    def _owed(self, t):
+        # neglect_hours(t, last_commit) for every pet
+        gap = (t - self.last_commit) / 3600
+        return np.where(gap > self.grace_hours, gap, 0.0)
+
+    def _new_day(self, today):
+        # Forget the commit days that fell out of the window
+        if today - self._today >= ACTIVE_WINDOW:
+            self._commit_days[:] = False
+        else:
+            for day in range(self._today + 1, today + 1):
+                self._commit_days[:, day % ACTIVE_WINDOW] = False
+        self._today = today
+        self.active_days = self._commit_days.sum(axis=1)
+
+    def _commits(self, times, pets):
+        np.fmax.at(self.last_commit, pets, times)
+        days = np.floor_divide(times, 86400).astype(np.int64)
+        recent = days > self._today - ACTIVE_WINDOW
+        keys = np.unique(pets[recent] * ACTIVE_WINDOW + days[recent] % ACTIVE_WINDOW)
+        rows, cols = np.divmod(keys, ACTIVE_WINDOW)
+        new = ~self._commit_days[rows, cols]
+        self._commit_days[rows, cols] = True
+        np.add.at(self.active_days, rows[new], 1)
+
+    def _decay(self, start, end):
+        # Pet.decay_memory for every pet that owes decay for (start, end]
+        hours = self._owed(end) - self._owed(start)
+        owing = np.flatnonzero(hours > 0)
+        if not owing.size:
+            return
+        hours = hours[owing] * (1 - np.minimum(self.active_days[owing], 30) / 60)
+        clarity_rate, bond_rate, corruption_rate = self.rates
+        values = self.values
+        values[owing, NAME_CLARITY] = np.maximum(0, values[owing, NAME_CLARITY] - hours * clarity_rate)
+        values[owing, BOND_LEVEL] = np.maximum(0, values[owing, BOND_LEVEL] - hours * bond_rate)
+        values[owing, FILE_CORRUPTION] = np.minimum(100, values[owing, FILE_CORRUPTION] + hours * corruption_rate)
+
+    def _boost(self, column, amount, pets):
+        # min(100, stat + amount) once per interaction; repeats are applied in turn to cap like Pet does
+        counts = np.bincount(pets, minlength=self.n_pets)
+        stat = self.values[:, column]
+        for i in range(int(counts.max(initial=0))):
+            more = counts > i
+            stat[more] = np.minimum(100, stat[more] + amount)
+        self.values[:, INTERACTION_COUNT] += counts
+
+    def _interactions(self, times, pets, kinds):
+        feeds = kinds == FEED
+        plays = kinds == PLAY
+        self._boost(HAPPINESS, FEED_HAPPINESS, pets[feeds])
+        self._boost(BOND_LEVEL, PLAY_BOND, pets[plays])
+        both = feeds | plays
+        np.maximum.at(self.last_interaction, pets[both], times[both])
+
+    def run(self, timeline, end, step=3600.0):
+        """Replay the timeline's events in (self.time, end] in steps of `step` seconds"""
+        start = self.time
+        first, last = np.searchsorted(timeline.times, [start, end], side='right')
+        times, pets, kinds = (a[first:last] for a in timeline)
+        bounds = list(step_times(start, end, step))
+        cuts = np.searchsorted(times, bounds, side='right')
+        done = 0
+        previous = start
+        for t, cut in zip(bounds, cuts):
+            today = _day(t)
+            if today != self._today:
+                self._new_day(today)
+            if cut > done:
+                commits = kinds[done:cut] == COMMIT
+                if commits.any():
+                    self._commits(times[done:cut][commits], pets[done:cut][commits])
+            self._decay(previous, t)
+            if cut > done:
+                self._interactions(times[done:cut], pets[done:cut], kinds[done:cut])
+            done = cut
+            previous = t
+        self.time = end
+
+
+def simulate_scalar(n_pets, timeline, start, end, step=3600.0):
+    """The same replay as TeamSim.run, pet by pet through Pet and DecayEngine"""
+    pets = []
+    for _ in range(n_pets):
+        pet = Pet()
+        pet.creation_time = pet.last_interaction = pet.decay_applied_until = start
+        pets.append(pet)
+    engines = [DecayEngine(pet) for pet in pets]
+    last_commit = [None] * n_pets
+    commit_days = [set() for _ in range(n_pets)]
+
+    events = [(t, p, k) for t, p, k in zip(timeline.times.tolist(), timeline.pets.tolist(),
+                                           timeline.kinds.tolist()) if start < t <= end]
+    i = 0
+    for t in step_times(start, end, step):
+        step_events = []
+        while i < len(events) and events[i][0] <= t:
+            step_events.append(events[i])
+            i += 1
+        for when, p, kind in step_events:
+            if kind == COMMIT:
+                last_commit[p] = when if last_commit[p] is None else max(last_commit[p], when)
+                commit_days[p].add(_day(when))
+        today = _day(t)
+        for p, (pet, engine) in enumerate(zip(pets, engines)):
+            active = sum(1 for day in commit_days[p] if today - ACTIVE_WINDOW < day <= today)
+            engine.set_commit_activity(last_commit[p], active)
+            engine.advance(t)
+        for when, p, kind in step_events:
+            if kind == FEED:
+                pets[p].feed(when)
+            elif kind == PLAY:
+                pets[p].play(when)
+    return pets
+
+
+def stat_matrix(pets):
+    """(n, len(STAT_FIELDS)) array of Pet stats, comparable to TeamSim.values"""
+    return np.array([pet._values for pet in pets], dtype=np.float64).reshape(len(pets), len(STAT_FIELDS))
@@ -0,0 +1,37 @@
+import threading
+import time
+
+
+class RenderScheduler:
+    """
+    Lets the game loop sleep until something needs drawing: another thread
+    calls wake() (key press, git update, resize) or the loop's next deadline
+    (animation frame, message expiry) passes.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._woken = False
+        self._dirty = True   # first frame always renders
+
+    def wake(self, dirty=True):
+        # Safe to call from any thread, or from a signal handler
+        with self._cond:
+            self._woken = True
+            self._dirty = self._dirty or dirty
+            self._cond.notify()
+
+    def take_dirty(self):
+        # True if a redraw was requested since the last call
+        with self._cond:
+            dirty, self._dirty = self._dirty, False
+            return dirty
+
+    def wait(self, deadline=None):
+        # Block until wake() or until time.time() reaches deadline (None = no deadline)
+        with self._cond:
+            if not self._woken:
+                timeout = None if deadline is None else max(0.0, deadline - time.time())
+                if timeout is None or timeout > 0:
+                    self._cond.wait(timeout)
+            self._woken = False
@@ -1,90 +1,480 @@
 import json
 import os
+import struct
+import sys
+from array import array
 from datetime import datetime
 import time
 
 SAVE_FILE = "pet_save.json"
+BINARY_SAVE_FILE = "pet_save.bin"
+# Changes since the last snapshot, one JSON line each
+JOURNAL_FILE = "pet_save.journal"
+# Journal entries before they are folded into a new snapshot
+COMPACT_EVERY = 100
+# Snapshot encoding: "json", or "binary" for a compact file that loads faster with a long history
+SAVE_FORMAT = os.environ.get("DEVGOTCHI_SAVE_FORMAT", "json")
+
+# Current save schema. Version 1 is the original unversioned file.
+SAVE_VERSION = 3
+
+# Nested save sections; their keys are journaled one by one
+SECTIONS = ("pet_memory", "stats", "player_memory")
+# Lists that only grow; the journal records just the new items
+APPEND_ONLY = ("interaction_times",)
+TIME_FIELDS = ("creation_time", "last_interaction", "last_commit", "decay_applied_until", "last_save_time")
+
+# Binary snapshot: header, compact JSON of everything except the history,
+# then the interaction history as little-endian float64s
+BINARY_MAGIC = b'DGSV'
+BINARY_HEADER = struct.Struct('<4sHHQII')   # magic, schema version, reserved, seq, fields length, history count
+
+
+class SaveFormatError(ValueError):
+    """The save file exists but isn't a valid pet save."""
+
+
+def pet_save_data(pet):
+    # Everything that goes into a save, as plain JSON data
+    return {
+        "version": SAVE_VERSION,
 
-def save_pet(pet):
-    # Save pet state to JSON file
-    save_data = {
         # Pet identity
         "pet_name": pet.pet_name,
         "creation_time": pet.creation_time,
-        
+
         # Pet's memory of owner
-        "pet_memory": pet.pet_memory,
-        
+        "pet_memory": dict(pet.pet_memory),
+
         # Pet stats
-        "stats": pet.stats,
-        
+        "stats": dict(pet.stats),
+
         # Player's memory (file corruption)
-        "player_memory": pet.player_memory,
-        
+        "player_memory": dict(pet.player_memory),
+
         # Timestamps
         "last_interaction": pet.last_interaction,
         "last_commit": pet.last_commit,
+        "interaction_times": list(pet.interaction_times),
+        "decay_applied_until": pet.decay_applied_until,
         "last_save_time": time.time()  # When we saved
     }
-    
+
+
+def pet_from_save_data(save_data, owner_name="Friend", pet_name="Buddy"):
+    from pet_system.pet_data import Pet
+
+    # Create pet and restore state
+    pet = Pet(owner_name=owner_name, pet_name=save_data.get("pet_name", pet_name))
+
+    # Restore all data
+    pet.creation_time = save_data.get("creation_time", time.time())
+    pet.pet_memory = save_data.get("pet_memory", pet.pet_memory)
+    pet.stats = save_data.get("stats", pet.stats)
+    pet.player_memory = save_data.get("player_memory", pet.player_memory)
+    pet.last_interaction = save_data.get("last_interaction", time.time())
+    pet.last_commit = save_data.get("last_commit", time.time())
+    pet.interaction_times = save_data.get("interaction_times", pet.interaction_times)
+    pet.decay_applied_until = save_data.get("decay_applied_until") or save_data.get("last_save_time") or time.time()
+    return pet
+
+
+# --- schema ---
+
+def _migrate_v1(save_data):
+    # v1 -> v2: adds the schema version and the interaction history
+    save_data.setdefault("interaction_times", [])
+    return save_data
+
+
+def _migrate_v2(save_data):
+    # v2 -> v3: adds decay_applied_until. Older versions applied decay at every
+    # launch, so the last save is the best guess for how far it got.
+    save_data.setdefault("decay_applied_until", save_data.get("last_save_time"))
+    return save_data
+
+
+# from_version -> function upgrading save data to from_version + 1
+MIGRATIONS = {
+    1: _migrate_v1,
+    2: _migrate_v2,
+}
+
+
+def migrate(save_data):
+    # Upgrade save data to SAVE_VERSION in place; returns the version it started at
+    version = save_data.get("version", 1)
+    if not isinstance(version, int) or version < 1:
+        raise SaveFormatError(f"Bad save version: {version!r}")
+    if version > SAVE_VERSION:
+        raise SaveFormatError(f"Save is from a newer DevGotchi (version {version})")
+    start = version
+    while version < SAVE_VERSION:
+        save_data = MIGRATIONS[version](save_data)
+        version += 1
+    save_data["version"] = SAVE_VERSION
+    return start
+
+
+def validate(save_data):
+    # Raise SaveFormatError unless save_data has the shape of a current save
+    if not isinstance(save_data, dict):
+        raise SaveFormatError("Save is not an object")
+    for section in SECTIONS:
+        if section in save_data and not isinstance(save_data[section], dict):
+            raise SaveFormatError(f"'{section}' is not an object")
+    for field in TIME_FIELDS:
+        value = save_data.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float))):
+            raise SaveFormatError(f"'{field}' is not a timestamp")
+    if not isinstance(save_data.get("pet_name", ""), str):
+        raise SaveFormatError("'pet_name' is not a string")
+    history = save_data.get("interaction_times", [])
+    try:
+        # array() checks every item in C, much faster than a Python loop over a long history
+        if not isinstance(history, list):
+            raise TypeError
+        array('d', history)
+    except TypeError:
+        raise SaveFormatError("'interaction_times' is not a list of timestamps") from None
+
+
+# --- encodings ---
+
+def encode_json(save_data, seq):
+    return json.dumps(dict(save_data, seq=seq), indent=2).encode('utf-8')
+
+
+def encode_binary(save_data, seq):
+    fields = {k: v for k, v in save_data.items() if k != "interaction_times"}
+    fields_blob = json.dumps(fields, separators=(',', ':')).encode('utf-8')
+    history = array('d', save_data.get("interaction_times", ()))
+    if sys.byteorder != 'little':
+        history.byteswap()
+    header = BINARY_HEADER.pack(BINARY_MAGIC, save_data.get("version", SAVE_VERSION), 0,
+                                seq, len(fields_blob), len(history))
+    return header + fields_blob + history.tobytes()
+
+
+def decode_snapshot(data):
+    # (save data, seq, format) from snapshot bytes in either encoding
+    if data[:4] == BINARY_MAGIC:
+        if len(data) < BINARY_HEADER.size:
+            raise SaveFormatError("Truncated binary save")
+        _, version, _, seq, fields_len, count = BINARY_HEADER.unpack_from(data)
+        start = BINARY_HEADER.size
+        end = start + fields_len
+        if len(data) != end + count * 8:
+            raise SaveFormatError("Truncated binary save")
+        save_data = json.loads(data[start:end])
+        if not isinstance(save_data, dict):
+            raise SaveFormatError("Save is not an object")
+        history = array('d')
+        history.frombytes(data[end:])
+        if sys.byteorder != 'little':
+            history.byteswap()
+        save_data["interaction_times"] = history.tolist()
+        save_data["version"] = version
+        return save_data, seq, "binary"
+
+    save_data = json.loads(data)
+    if not isinstance(save_data, dict):
+        raise SaveFormatError("Save is not an object")
+    return save_data, save_data.pop("seq", 0), "json"
+
+
+# --- journal ---
+
+def _flatten(save_data):
+    # {"stats.happiness": 90, "pet_name": ...}: one entry per value the journal tracks
+    flat = {}
+    for key, value in save_data.items():
+        if key in SECTIONS and isinstance(value, dict):
+            for name, item in value.items():
+                flat[f"{key}.{name}"] = item
+        else:
+            flat[key] = value
+    return flat
+
+
+def _copy_flat(flat):
+    # Values are scalars or lists/dicts of scalars, so one level of copying is enough
+    return {path: list(value) if isinstance(value, list) else dict(value) if isinstance(value, dict) else value
+            for path, value in flat.items()}
+
+
+def _apply(save_data, entry):
+    for path, value in entry.get("set", {}).items():
+        section, _, name = path.partition('.')
+        if name and section in SECTIONS:
+            save_data.setdefault(section, {})[name] = value
+        else:
+            save_data[path] = value
+    for path, items in entry.get("append", {}).items():
+        save_data.setdefault(path, []).extend(items)
+
+
+def _diff(saved, flat):
+    # Journal entry fields for what changed between two flattened states
+    changes = {}
+    appended = {}
+    for path, value in flat.items():
+        old = saved.get(path)
+        if old == value:
+            continue
+        if (path in APPEND_ONLY and isinstance(old, list) and isinstance(value, list)
+                and len(value) > len(old) and value[:len(old)] == old):
+            appended[path] = value[len(old):]
+        else:
+            changes[path] = value
+    return changes, appended
+
+
+def write_atomic(path, data):
+    # Write to a temp file, fsync, then rename over path: readers see the old or the new file, never half of one
+    directory = os.path.dirname(os.path.abspath(path))
+    tmp = f"{path}.{os.getpid()}.tmp"
     try:
-        with open(SAVE_FILE, 'w') as f:
-            json.dump(save_data, f, indent=2)
+        with open(tmp, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    if os.name == 'posix':
+        # Make the rename itself durable
+        dir_fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class SaveStore:
+    """
+    Crash-safe pet saves: a snapshot replaced atomically, plus an append-only
+    journal of the values that changed since (with the event that changed
+    them). Every compact_every entries the journal is folded into a new
+    snapshot. A torn journal line is ignored on load, so at worst the last
+    change is lost, never the pet. The snapshot is JSON or binary (format);
+    either one is read, and the next snapshot switches to format.
+    """
+
+    def __init__(self, path=None, journal_path=JOURNAL_FILE, compact_every=COMPACT_EVERY,
+                 format=SAVE_FORMAT):
+        if format not in ("json", "binary"):
+            raise ValueError(f"Unknown save format: {format}")
+        self.format = format
+        self.path = path or (BINARY_SAVE_FILE if format == "binary" else SAVE_FILE)
+        self.journal_path = journal_path
+        self.compact_every = compact_every
+        self.seq = 0            # sequence number of the last write
+        self._entries = 0       # journal entries since the last snapshot
+        self._saved = None      # flattened state as of the last write
+        self._stale = False     # snapshot is an older schema or the other format
+
+    def _other_path(self):
+        # The snapshot left behind in the other format, if the format was switched
+        return SAVE_FILE if self.path == BINARY_SAVE_FILE else (
+            BINARY_SAVE_FILE if self.path == SAVE_FILE else None)
+
+    def _snapshot_path(self):
+        if os.path.exists(self.path):
+            return self.path
+        other = self._other_path()
+        if other and os.path.exists(other):
+            return other
+        return None
+
+    def exists(self):
+        return self._snapshot_path() is not None
+
+    def _read_journal(self, after_seq):
+        # Journal entries newer than the snapshot. Replay stops at the first torn or
+        # invalid line, and the journal is cut back to the line before it so that
+        # later appends start on a clean line and are replayed.
+        entries = []
+        good = 0                # end of the last complete, valid line
+        try:
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    if not isinstance(entry, dict) or not line.endswith(b'\n'):
+                        break
+                    good += len(line)
+                    if entry.get("seq", 0) > after_seq:
+                        entries.append(entry)
+                torn = f.seek(0, os.SEEK_END) > good
+        except FileNotFoundError:
+            return entries
+        if torn:
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(good)
+                f.flush()
+                os.fsync(f.fileno())
+        return entries
+
+    def load_with_meta(self):
+        # (save data, meta) with the journal replayed and the schema migrated, or (None, None).
+        # The snapshot and journal are each read once.
+        path = self._snapshot_path()
+        if path is None:
+            return None, None
+        with open(path, 'rb') as f:
+            save_data, seq, encoding = decode_snapshot(f.read())
+        entries = self._read_journal(seq)
+        for entry in entries:
+            _apply(save_data, entry)
+            seq = entry["seq"]
+        migrated_from = migrate(save_data)
+        validate(save_data)
+
+        self.seq = seq
+        self._entries = len(entries)
+        self._saved = _copy_flat(_flatten(save_data))
+        self._stale = migrated_from != SAVE_VERSION or encoding != self.format
+        meta = {
+            "version": save_data["version"],
+            "migrated_from": migrated_from if migrated_from != SAVE_VERSION else None,
+            "format": encoding,
+            "path": path,
+            "seq": seq,
+            "journal_entries": len(entries),
+            "last_save_time": save_data.get("last_save_time"),
+        }
+        return save_data, meta
+
+    def load(self):
+        # Save data only, or None if there is no save
+        return self.load_with_meta()[0]
+
+    def save(self, pet, event=None):
+        # Append what changed since the last write; snapshot on first save and every compact_every entries
+        save_data = pet_save_data(pet)
+        if self._saved is None and self.exists():
+            try:
+                self.load()
+            except (OSError, ValueError):
+                self._saved = None
+        if self._saved is None or self._stale or self._entries + 1 >= self.compact_every:
+            self.compact(save_data)
+            return
+
+        flat = _flatten(save_data)
+        changes, appended = _diff(self._saved, flat)
+        self.seq += 1
+        entry = {"seq": self.seq, "time": save_data["last_save_time"], "set": changes}
+        if appended:
+            entry["append"] = appended
+        if event:
+            entry["event"] = event
+        with open(self.journal_path, 'ab') as f:
+            f.write(json.dumps(entry, separators=(',', ':')).encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._entries += 1
+        self._saved = _copy_flat(flat)
+
+    def compact(self, save_data):
+        # New snapshot first, then drop the journal; entries it already covers are skipped on load anyway
+        self.seq += 1
+        encode = encode_binary if self.format == "binary" else encode_json
+        write_atomic(self.path, encode(save_data, self.seq))
+        with open(self.journal_path, 'wb'):
+            pass
+        other = self._other_path()
+        if other and os.path.exists(other):
+            os.remove(other)
+        self._entries = 0
+        self._stale = False
+        self._saved = _copy_flat(_flatten(save_data))
+
+    def quarantine(self):
+        # Move an unreadable save aside so the next save can't overwrite it
+        for path in (self._snapshot_path(), self.journal_path):
+            if path and os.path.exists(path):
+                os.replace(path, path + ".corrupt")
+        self._saved = None
+
+    def delete(self):
+        removed = False
+        for path in (self.path, self._other_path(), self.journal_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+                removed = True
+        self.seq = 0
+        self._entries = 0
+        self._saved = None
+        return removed
+
+
+_store = None
+
+
+def save_store():
+    # The store for the save files, shared by the helpers below
+    global _store
+    if _store is None:
+        _store = SaveStore()
+    return _store
+
+
+def save_exists():
+    return save_store().exists()
+
+
+def save_pet(pet, event=None):
+    # Save pet state (event: what changed it, e.g. "feed", "decay", "quit")
+    try:
+        save_store().save(pet, event)
         return True
     except Exception as e:
         print(f"Save error: {e}")
         return False
 
-def load_pet(owner_name="Friend", pet_name="Buddy"):
-    # Load pet from save file or create new one.
+def load_save(owner_name="Friend", pet_name="Buddy"):
+    # (pet, meta) from one read of the save. meta is None for a new pet;
+    # otherwise it has the schema version, format, seq and last_save_time.
     from pet_system.pet_data import Pet
-    
-    # Check if save exists
-    if not os.path.exists(SAVE_FILE):
-        # New pet
-        return Pet(owner_name=owner_name, pet_name=pet_name)
-    
+
     try:
-        with open(SAVE_FILE, 'r') as f:
-            save_data = json.load(f)
-        
-        # Create pet and restore state
-        pet = Pet(owner_name=owner_name, pet_name=save_data.get("pet_name", pet_name))
-        
-        # Restore all data
-        pet.creation_time = save_data.get("creation_time", time.time())
-        pet.pet_memory = save_data.get("pet_memory", pet.pet_memory)
-        pet.stats = save_data.get("stats", pet.stats)
-        pet.player_memory = save_data.get("player_memory", pet.player_memory)
-        pet.last_interaction = save_data.get("last_interaction", time.time())
-        pet.last_commit = save_data.get("last_commit", time.time())
-        
-        return pet
-        
+        save_data, meta = save_store().load_with_meta()
+        if save_data is None:
+            # New pet
+            return Pet(owner_name=owner_name, pet_name=pet_name), None
+        return pet_from_save_data(save_data, owner_name, pet_name), meta
+
     except Exception as e:
-        print(f"Load error: {e}, creating new pet")
-        return Pet(owner_name=owner_name, pet_name=pet_name)
+        print(f"Load error: {e}, creating new pet (old save kept with a .corrupt suffix)")
+        save_store().quarantine()
+        return Pet(owner_name=owner_name, pet_name=pet_name), None
 
-def calculate_decay_since_last_save():
-    # Calculate how many hours passed since last save.
-    if not os.path.exists(SAVE_FILE):
-        return 0.0
-    
+def load_pet(owner_name="Friend", pet_name="Buddy"):
+    # Load pet from save file or create new one.
+    return load_save(owner_name, pet_name)[0]
+
+def calculate_decay_since_last_save(meta=None):
+    # Calculate how many hours passed since last save (pass load_save's meta to skip reading the file again).
     try:
-        with open(SAVE_FILE, 'r') as f:
-            save_data = json.load(f)
-        
-        last_save = save_data.get("last_save_time", time.time())
+        if meta is None:
+            _, meta = save_store().load_with_meta()
+        if meta is None:
+            return 0.0
+
+        last_save = meta.get("last_save_time") or time.time()
         now = time.time()
         hours = (now - last_save) / 3600
-        
+
         return max(0, hours)
     except:
         return 0.0
 
 def delete_save():
     # Delete save file (for testing or pet death)
-    if os.path.exists(SAVE_FILE):
-        os.remove(SAVE_FILE)
-        return True
-    return False
+    return save_store().delete()
@@ -0,0 +1,33 @@
+import os
+
+# Tunables shared by game.py and async_runtime.py. They live here rather than
+# in game.py because `game.py --async` runs game.py as __main__; importing
+# them from `game` would load it a second time as a separate module.
+
+# Seconds between sprite frames while a message or action is playing
+ANIMATION_INTERVAL = 0.15
+# Longest the loop sleeps with nothing scheduled (safety net for missed wakeups)
+IDLE_WAKEUP = 5.0
+# Keyboard backend: "terminal" reads this terminal's stdin (POSIX only),
+# "pynput" hooks the global keyboard and needs a display server
+INPUT_BACKEND = os.environ.get("DEVGOTCHI_INPUT", "terminal" if os.name == 'posix' else "pynput")
+# Keys the game loop acts on
+GAME_KEYS = frozenset({'UP', 'DOWN', 'LEFT', 'RIGHT', 'ENTER', 'q'})
+# Menu actions that play a sprite animation
+ANIMATED_ACTIONS = ('dance', 'sit', 'sing', 'feed', 'play')
+# How long an action animation plays, in seconds
+ACTION_DURATION = 2.0
+# Seconds between stat history samples while nothing changes
+HISTORY_SAMPLE_INTERVAL = 60.0
+# Seconds between small decay updates while the game runs
+DECAY_TICK = 60.0
+# Seconds between re-reading the last commit time (a commit stops the decay)
+DECAY_CHECK_INTERVAL = 300.0
+# Seconds between git polls when installed hooks (commit_events.py) or the ref
+# watcher (git_watch.py) report changes; polling then only keeps relative dates fresh
+# and catches what hooks don't see
+PUSHED_POLL_INTERVAL = 60.0
+# Set to exit right after the first frame is drawn (used by bench_startup.py)
+EXIT_AFTER_FIRST_FRAME = bool(os.environ.get("DEVGOTCHI_EXIT_AFTER_FIRST_FRAME"))
+# Keys waiting to be handled before stdin stops being read (async runtime)
+INPUT_BACKLOG = 64
@@ -0,0 +1,264 @@
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+
+# Sprite name -> file in the sprite directory. Files are read on first use,
+# and a file shared by several sprites is only read once.
+SPRITE_FILES = {
+    "happy": "happy.txt",
+    "normal": "normal.txt",
+    "sadness": "sadness.txt",
+    "fear": "fear.txt",
+    "anger": "anger.txt",
+    "regular": "regular.txt",
+    "dance": "dance.txt",
+    "sit": "sit.txt",
+    "sing": "happy.txt",
+    "feed": "happy.txt",
+    "play": "happy.txt",
+}
+
+SPRITE_DIR = os.environ.get(
+    "DEVGOTCHI_SPRITES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "pet_sprites")
+)
+# Set to a file path to load sprites from a compiled atlas
+ATLAS_FILE = os.environ.get("DEVGOTCHI_SPRITE_ATLAS")
+
+ATLAS_MAGIC = b'DGSA'
+ATLAS_VERSION = 1
+ATLAS_HEADER = struct.Struct('<4sHHI')   # magic, version, reserved, index length
+
+
+def parse_sprite_frames(content):
+    # Frames are separated by "===" lines, or else by two or more blank lines
+    if "===" in content:
+        frames = content.split("===")
+    else:
+        frames = re.split(r'\n{3,}', content)
+    return [frame.strip('\n') for frame in frames if frame.strip()]
+
+
+def read_sprite_file(path):
+    # Opens with utf-8, fallback to system default if it fails
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return f.read()
+    except UnicodeDecodeError:
+        with open(path, 'r') as f:
+            return f.read()
+
+
+def load_sprite_frames(filename, directory=SPRITE_DIR):
+    """
+    Load sprite frames from a text file.
+    If file has multiple frames, they're separated by blank lines.
+    """
+    try:
+        frames = parse_sprite_frames(read_sprite_file(os.path.join(directory, filename)))
+        return frames if frames else ["???"]
+    except FileNotFoundError:
+        return ["???"]
+    except Exception as e:
+        return [f"Error: {str(e)}"]
+
+
+def _source_stat(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def compile_atlas(directory=SPRITE_DIR, atlas_path=None, files=None):
+    # Pack every sprite file into one atlas: a JSON index, then each unique line once.
+    atlas_path = atlas_path or os.path.join(directory, "sprites.atlas")
+    if files is None:
+        files = sorted(name for name in os.listdir(directory) if name.endswith('.txt'))
+
+    line_ids = {}
+    blob = bytearray()
+    lines = []
+    frames = {}
+    sources = {}
+    for name in files:
+        path = os.path.join(directory, name)
+        sources[name] = _source_stat(path)
+        frame_list = []
+        for frame in parse_sprite_frames(read_sprite_file(path)):
+            ids = []
+            for line in frame.split('\n'):
+                line_id = line_ids.get(line)
+                if line_id is None:
+                    data = line.encode('utf-8')
+                    line_id = line_ids[line] = len(lines)
+                    lines.append([len(blob), len(data)])
+                    blob += data
+                ids.append(line_id)
+            frame_list.append(ids)
+        frames[name] = frame_list
+
+    index = json.dumps({"sources": sources, "lines": lines, "frames": frames},
+                       separators=(',', ':')).encode('utf-8')
+    tmp = atlas_path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(ATLAS_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, 0, len(index)))
+        f.write(index)
+        f.write(blob)
+    os.replace(tmp, atlas_path)
+    return atlas_path
+
+
+class SpriteAtlas:
+    """Memory-mapped compiled atlas; frames are decoded on first use."""
+
+    def __init__(self, atlas_path):
+        with open(atlas_path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, index_len = ATLAS_HEADER.unpack_from(self._mm)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION:
+            self._mm.close()
+            raise ValueError(f"Not a sprite atlas: {atlas_path}")
+        start = ATLAS_HEADER.size
+        index = json.loads(self._mm[start:start + index_len])
+        self._blob = start + index_len
+        self.sources = index["sources"]
+        self._lines = index["lines"]
+        self._frames = index["frames"]
+        self._decoded = {}
+
+    def is_fresh(self, directory, files):
+        # False if any wanted sprite file is missing from the atlas or changed since
+        for name in files:
+            try:
+                if self.sources.get(name) != _source_stat(os.path.join(directory, name)):
+                    return False
+            except OSError:
+                if name in self.sources:
+                    return False
+        return True
+
+    def _line(self, line_id):
+        line = self._decoded.get(line_id)
+        if line is None:
+            offset, length = self._lines[line_id]
+            start = self._blob + offset
+            line = self._decoded[line_id] = self._mm[start:start + length].decode('utf-8')
+        return line
+
+    def frames(self, name):
+        ids = self._frames.get(name)
+        if ids is None:
+            return None
+        return ['\n'.join(self._line(i) for i in frame) for frame in ids]
+
+    def close(self):
+        self._mm.close()
+
+
+class SpriteRegistry:
+    """
+    Dict-like sprite name -> frames, loaded lazily. Identical frames across
+    files share one string. With atlas_path, frames come from a compiled
+    atlas that is rebuilt whenever a source sprite changes.
+    """
+
+    def __init__(self, directory=SPRITE_DIR, files=SPRITE_FILES, atlas_path=None):
+        self.directory = directory
+        self.files = dict(files)
+        self.atlas_path = atlas_path
+        self._atlas = None
+        self._by_name = {}
+        self._by_file = {}
+        self._frame_pool = {}
+        self._listing = None
+
+    def _resolve(self, filename):
+        # Exact name first, then a case-insensitive match (e.g. Dance.txt for dance.txt)
+        if os.path.exists(os.path.join(self.directory, filename)):
+            return filename
+        if self._listing is None:
+            try:
+                self._listing = {name.lower(): name for name in os.listdir(self.directory)}
+            except OSError:
+                self._listing = {}
+        return self._listing.get(filename.lower(), filename)
+
+    def _open_atlas(self):
+        if self._atlas is None:
+            wanted = sorted({self._resolve(f) for f in self.files.values()})
+            try:
+                atlas = SpriteAtlas(self.atlas_path)
+                if not atlas.is_fresh(self.directory, wanted):
+                    atlas.close()
+                    atlas = None
+            except (OSError, ValueError):
+                atlas = None
+            if atlas is None:
+                compile_atlas(self.directory, self.atlas_path,
+                              [f for f in wanted if os.path.exists(os.path.join(self.directory, f))])
+                atlas = SpriteAtlas(self.atlas_path)
+            self._atlas = atlas
+        return self._atlas
+
+    def _load_file(self, filename):
+        filename = self._resolve(filename)
+        frames = self._by_file.get(filename)
+        if frames is None:
+            if self.atlas_path:
+                try:
+                    frames = self._open_atlas().frames(filename)
+                except (OSError, ValueError):
+                    frames = None
+            if frames is None:
+                frames = load_sprite_frames(filename, self.directory)
+            frames = [self._frame_pool.setdefault(frame, frame) for frame in frames] or ["???"]
+            self._by_file[filename] = frames
+        return frames
+
+    def __getitem__(self, name):
+        frames = self._by_name.get(name)
+        if frames is None:
+            if name not in self.files:
+                raise KeyError(name)
+            frames = self._by_name[name] = self._load_file(self.files[name])
+        return frames
+
+    def get(self, name, default=None):
+        try:
+            return self[name]
+        except KeyError:
+            return default
+
+    def __contains__(self, name):
+        return name in self.files
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def __len__(self):
+        return len(self.files)
+
+    def keys(self):
+        return self.files.keys()
+
+    def invalidate(self):
+        # Forget loaded frames so the next lookup re-reads (or recompiles) the sprites
+        if self._atlas is not None:
+            self._atlas.close()
+            self._atlas = None
+        self._by_name.clear()
+        self._by_file.clear()
+        self._frame_pool.clear()
+        self._listing = None
+
+
+PET_SPRITES = SpriteRegistry(atlas_path=ATLAS_FILE)
+
+
+if __name__ == "__main__":
+    # uv run sprites.py [sprite_dir] [atlas_path]: compile an atlas
+    directory = sys.argv[1] if len(sys.argv) > 1 else SPRITE_DIR
+    path = compile_atlas(directory, sys.argv[2] if len(sys.argv) > 2 else None)
+    print(f"✅ Wrote {path}")
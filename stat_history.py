@@ -0,0 +1,211 @@
+import os
+import sqlite3
+import threading
+import time
+
+from save_system import SAVE_FILE
+
+# Stat samples over time in a local SQLite database (WAL mode), kept in three
+# tiers: raw samples for a day, hourly averages for a month, daily averages
+# forever. Hourly and daily rows are rolled up as samples are written, so
+# expiring a tier is a plain range delete. Events are kept for EVENT_RETENTION.
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(SAVE_FILE)), "stat_history.db")
+
+# Stat name -> how to read it from a Pet. The position is the id stored in
+# the database, so only ever append to this.
+STATS = (
+    ("health", lambda pet: pet.health),
+    ("happiness", lambda pet: pet.happiness),
+    ("bond_level", lambda pet: pet.bond_level),
+    ("name_clarity", lambda pet: pet.name_clarity),
+    ("file_corruption", lambda pet: pet.file_corruption),
+)
+STAT_IDS = {name: i for i, (name, _) in enumerate(STATS)}
+
+RAW, HOURLY, DAILY = 0, 1, 2
+TIER_SECONDS = {RAW: 1, HOURLY: 3600, DAILY: 86400}
+# How long each tier is kept (None = forever)
+RETENTION = {RAW: 86400, HOURLY: 30 * 86400, DAILY: None}
+# How long events (feeds, commits, decay...) are kept, in seconds
+EVENT_RETENTION = 90 * 86400
+
+# Buffered samples/events are written in one transaction when either limit is hit
+BATCH_SIZE = 50
+FLUSH_INTERVAL = 30.0
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    tier INTEGER NOT NULL,
+    stat INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,   -- sample second (raw) or start of the hour/day
+    total REAL NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (tier, stat, bucket)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS events (
+    ts REAL NOT NULL,
+    kind TEXT NOT NULL,
+    detail TEXT
+);
+CREATE INDEX IF NOT EXISTS events_ts ON events (ts);
+"""
+
+UPSERT = """
+INSERT INTO samples (tier, stat, bucket, total, count) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (tier, stat, bucket) DO UPDATE SET
+    total = total + excluded.total,
+    count = count + excluded.count
+"""
+
+
+def _bucket(ts, tier):
+    # Start of the tier's bucket containing ts (local days for the daily tier)
+    ts = int(ts)
+    if tier == DAILY:
+        local = time.localtime(ts)
+        return ts - (local.tm_hour * 3600 + local.tm_min * 60 + local.tm_sec)
+    return ts - ts % TIER_SECONDS[tier]
+
+
+def pick_tier(start, now=None):
+    # Finest tier that still covers everything back to start
+    age = (time.time() if now is None else now) - start
+    for tier in (RAW, HOURLY):
+        if age <= RETENTION[tier]:
+            return tier
+    return DAILY
+
+
+def sparkline(values, width, low=0.0, high=100.0):
+    # One block character per value, scaled between low and high; None is a gap
+    chars = []
+    span = (high - low) or 1.0
+    for value in values[-width:]:
+        if value is None:
+            chars.append(" ")
+        else:
+            level = (min(high, max(low, value)) - low) / span
+            chars.append(SPARK_CHARS[min(len(SPARK_CHARS) - 1, int(level * len(SPARK_CHARS)))])
+    return "".join(chars).rjust(width)
+
+
+class StatHistory:
+    """
+    Pet stat samples and events in SQLite. record() and record_event() only
+    buffer; the buffer is written in one transaction every BATCH_SIZE rows
+    or FLUSH_INTERVAL seconds, and on flush()/close(). version changes
+    whenever new data lands, so callers can cache queries.
+    """
+
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self.version = 0
+        self._lock = threading.Lock()
+        self._samples = []
+        self._events = []
+        self._first_buffered = None
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    # --- writing ---
+
+    def record(self, pet, now=None):
+        # Buffer one sample of every stat
+        now = time.time() if now is None else now
+        with self._lock:
+            for stat, (_, read) in enumerate(STATS):
+                self._samples.append((now, stat, float(read(pet))))
+            self._buffered(now)
+
+    def record_event(self, kind, detail=None, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self._events.append((now, kind, None if detail is None else str(detail)))
+            self._buffered(now)
+
+    def _buffered(self, now):
+        if self._first_buffered is None:
+            self._first_buffered = now
+        if (len(self._samples) + len(self._events) >= BATCH_SIZE
+                or now - self._first_buffered >= FLUSH_INTERVAL):
+            self._flush_locked(now)
+
+    def flush(self, now=None):
+        with self._lock:
+            self._flush_locked(time.time() if now is None else now)
+
+    def _flush_locked(self, now):
+        samples, self._samples = self._samples, []
+        events, self._events = self._events, []
+        self._first_buffered = None
+        if not samples and not events:
+            return
+        rows = []
+        for ts, stat, value in samples:
+            for tier in (RAW, HOURLY, DAILY):
+                rows.append((tier, stat, _bucket(ts, tier), value, 1))
+        with self._db:
+            self._db.executemany(UPSERT, rows)
+            self._db.executemany("INSERT INTO events (ts, kind, detail) VALUES (?, ?, ?)", events)
+            self._expire(now)
+        self.version += 1
+
+    def _expire(self, now):
+        for tier, keep in RETENTION.items():
+            if keep is not None:
+                self._db.execute("DELETE FROM samples WHERE tier = ? AND bucket < ?",
+                                 (tier, int(now - keep)))
+        self._db.execute("DELETE FROM events WHERE ts < ?", (now - EVENT_RETENTION,))
+
+    # --- reading ---
+
+    def series(self, stat, start, end=None, tier=None, now=None):
+        # [(bucket time, average)] for one stat, oldest first, from the finest tier that covers start
+        now = time.time() if now is None else now
+        end = now if end is None else end
+        tier = pick_tier(start, now) if tier is None else tier
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT bucket, total / count FROM samples"
+                " WHERE tier = ? AND stat = ? AND bucket >= ? AND bucket <= ? ORDER BY bucket",
+                (tier, STAT_IDS[stat], _bucket(start, tier), int(end))
+            ).fetchall()
+        return rows
+
+    def binned(self, stat, window, bins, now=None):
+        # Average of each of `bins` equal slices of the last `window` seconds (None where empty)
+        now = time.time() if now is None else now
+        start = now - window
+        totals = [0.0] * bins
+        counts = [0] * bins
+        for bucket, value in self.series(stat, start, now=now):
+            i = min(bins - 1, max(0, int((bucket - start) / window * bins)))
+            totals[i] += value
+            counts[i] += 1
+        return [totals[i] / counts[i] if counts[i] else None for i in range(bins)]
+
+    def sparkline(self, stat, width=10, window=7 * 86400, invert=False, now=None):
+        values = self.binned(stat, window, width, now=now)
+        if invert:
+            values = [None if v is None else 100 - v for v in values]
+        return sparkline(values, width)
+
+    def events(self, start, end=None, kind=None):
+        end = time.time() if end is None else end
+        query = "SELECT ts, kind, detail FROM events WHERE ts >= ? AND ts <= ?"
+        args = [start, end]
+        if kind is not None:
+            query += " AND kind = ?"
+            args.append(kind)
+        with self._lock:
+            return self._db.execute(query + " ORDER BY ts", args).fetchall()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._db.close()
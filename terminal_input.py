@@ -0,0 +1,152 @@
+import codecs
+import os
+import selectors
+import sys
+import threading
+
+if os.name == 'posix':
+    import tty
+    import termios
+
+# How long a lone ESC waits for the rest of an escape sequence
+ESCAPE_TIMEOUT = 0.05
+
+# Final byte of an arrow key sequence (ESC [ A, or ESC O A in application mode)
+ARROWS = {'A': 'UP', 'B': 'DOWN', 'C': 'RIGHT', 'D': 'LEFT'}
+
+
+class KeyParser:
+    """
+    Turns terminal input into key names: 'UP', 'DOWN', 'LEFT', 'RIGHT',
+    'ENTER', 'ESC', or the typed character. Escape sequences may arrive
+    split across reads; anything unrecognised is dropped.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._pending = ''
+
+    @property
+    def pending(self):
+        # True while an escape sequence is incomplete
+        return bool(self._pending)
+
+    def feed(self, data):
+        text = self._pending + self._decoder.decode(data)
+        self._pending = ''
+        keys = []
+        i = 0
+        while i < len(text):
+            ch = text[i]
+            if ch != '\x1b':
+                keys.append('ENTER' if ch in '\r\n' else ch)
+                i += 1
+                continue
+
+            if i + 1 == len(text):
+                self._pending = text[i:]
+                break
+            kind = text[i + 1]
+            if kind == 'O':
+                # SS3: ESC O <final>
+                if i + 2 == len(text):
+                    self._pending = text[i:]
+                    break
+                if text[i + 2] in ARROWS:
+                    keys.append(ARROWS[text[i + 2]])
+                i += 3
+            elif kind == '[':
+                # CSI: ESC [ <parameters> <final byte in @..~>, e.g. ESC [ 1 ; 5 A
+                end = i + 2
+                while end < len(text) and not '@' <= text[end] <= '~':
+                    end += 1
+                if end == len(text):
+                    self._pending = text[i:]
+                    break
+                if text[end] in ARROWS:
+                    keys.append(ARROWS[text[end]])
+                i = end + 1
+            else:
+                # ESC followed by a normal key (Alt+key): report both
+                keys.append('ESC')
+                i += 1
+        return keys
+
+    def flush(self):
+        # The rest of an escape sequence never came: a lone ESC is the Escape key
+        pending, self._pending = self._pending, ''
+        return ['ESC'] if pending else []
+
+
+class TerminalInput:
+    """
+    Reads keys from a terminal on a background thread and passes each key
+    name to on_key. The terminal stays in cbreak mode from start() to stop(),
+    so it works over SSH and without a display server, and only sees keys
+    typed into this terminal. start()/stop() match pynput's Listener.
+    """
+
+    def __init__(self, on_key, fd=None):
+        self.on_key = on_key
+        self.fd = sys.stdin.fileno() if fd is None else fd
+        self.parser = KeyParser()
+        self._thread = None
+        self._old_settings = None
+        self._wakeup = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if os.isatty(self.fd):
+            self._old_settings = termios.tcgetattr(self.fd)
+            tty.setcbreak(self.fd)
+        # Writing to this pipe is how stop() interrupts the select
+        self._wakeup = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="terminal-input", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        try:
+            os.write(self._wakeup[1], b'x')
+        except OSError:
+            pass
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        self._thread = None
+        for fd in self._wakeup:
+            os.close(fd)
+        self._wakeup = None
+        if self._old_settings is not None:
+            termios.tcsetattr(self.fd, termios.TCSADRAIN, self._old_settings)
+            self._old_settings = None
+
+    def _emit(self, keys):
+        for key in keys:
+            try:
+                self.on_key(key)
+            except Exception:
+                pass
+
+    def _run(self):
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.fd, selectors.EVENT_READ)
+            selector.register(self._wakeup[0], selectors.EVENT_READ)
+            while True:
+                events = selector.select(ESCAPE_TIMEOUT if self.parser.pending else None)
+                if not events:
+                    self._emit(self.parser.flush())
+                    continue
+                for key, _ in events:
+                    if key.fd == self._wakeup[0]:
+                        return
+                    try:
+                        data = os.read(self.fd, 1024)
+                    except OSError:
+                        return
+                    if not data:
+                        # stdin closed
+                        self._emit(self.parser.flush())
+                        return
+                    self._emit(self.parser.feed(data))
@@ -0,0 +1,95 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from git_reader import GitRepository, find_git_dir
+
+# python -m unittest test_git_reader
+
+GIT_ENV = {
+    "GIT_AUTHOR_NAME": "Ada Lovelace", "GIT_AUTHOR_EMAIL": "ada@example.com",
+    "GIT_COMMITTER_NAME": "Ada Lovelace", "GIT_COMMITTER_EMAIL": "ada@example.com",
+    "GIT_CONFIG_GLOBAL": os.devnull, "GIT_CONFIG_NOSYSTEM": "1",
+}
+
+
+@unittest.skipUnless(shutil.which("git"), "needs git")
+class PackedRepositoryTest(unittest.TestCase):
+    """GitRepository against `git cat-file` on a repo packed by `git gc`."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls._dir = tempfile.TemporaryDirectory()
+        cls.path = cls._dir.name
+        cls.git("init", "-q", "-b", "main")
+        # One line of a long file changes per commit, so gc stores most versions as deltas
+        lines = [f"line {i}: {'quack ' * (i % 7)}\n" for i in range(200)]
+        for n in range(12):
+            lines[n * 13] = f"changed in commit {n}\n"
+            with open(os.path.join(cls.path, "duck.txt"), "w") as f:
+                f.writelines(lines)
+            cls.git("add", "duck.txt")
+            date = f"{1_700_000_000 + n * 3600} +0100"
+            cls.git("commit", "-q", "-m", f"Commit {n}\n\nBody of commit {n}.",
+                    env={"GIT_AUTHOR_DATE": date, "GIT_COMMITTER_DATE": date})
+            if n == 5:
+                cls.git("branch", "feature")
+                cls.git("tag", "-a", "v1", "-m", "first tag")
+        cls.git("gc", "-q", "--aggressive")
+        cls.repo = GitRepository(find_git_dir(cls.path))
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.repo.close()
+        cls._dir.cleanup()
+
+    @classmethod
+    def git(cls, *args, env=None, binary=False):
+        result = subprocess.run(["git", *args], cwd=cls.path, capture_output=True, check=True,
+                                env=dict(os.environ, **GIT_ENV, **(env or {})))
+        return result.stdout if binary else result.stdout.decode().strip()
+
+    def test_packed(self):
+        # Everything is in the pack, and some of it is deltified
+        self.assertEqual(self.git("count-objects", "-v").splitlines()[0], "count: 0")
+        bases = self.git("cat-file", "--batch-all-objects", "--batch-check=%(deltabase)").split()
+        self.assertTrue(any(base != "0" * 40 for base in bases))
+
+    def test_refs(self):
+        self.assertEqual(self.repo.resolve_head(), self.git("rev-parse", "HEAD"))
+        for line in self.git("for-each-ref", "--format=%(objectname) %(refname)").splitlines():
+            sha, name = line.split()
+            self.assertEqual(self.repo.read_ref(name), sha, name)
+        self.assertIsNone(self.repo.read_ref("refs/heads/missing"))
+
+    def test_objects(self):
+        shas = self.git("cat-file", "--batch-all-objects", "--batch-check=%(objectname)").split()
+        batch = subprocess.run(["git", "cat-file", "--batch"], cwd=self.path, check=True,
+                               input="\n".join(shas).encode() + b"\n", capture_output=True).stdout
+        pos = 0
+        for sha in shas:
+            header_end = batch.index(b"\n", pos)
+            _, obj_type, size = batch[pos:header_end].decode().split()
+            body = batch[header_end + 1:header_end + 1 + int(size)]
+            pos = header_end + 1 + int(size) + 1
+            self.assertEqual(self.repo.read_object(sha), (obj_type, body), sha)
+
+    def test_commits(self):
+        log = self.git("log", "--all", "--format=%H%x00%T%x00%P%x00%an%x00%ae%x00%at%x00%ct%x00%s")
+        for line in log.splitlines():
+            sha, tree, parents, name, email, author_time, commit_time, subject = line.split("\0")
+            commit = self.repo.read_commit(sha)
+            self.assertEqual(commit["tree"], tree)
+            self.assertEqual(commit["parents"], parents.split())
+            self.assertEqual((commit["author"], commit["author_email"]), (name, email))
+            self.assertEqual(commit["author_time"], int(author_time))
+            self.assertEqual(commit["commit_time"], int(commit_time))
+            self.assertEqual(commit["subject"], subject)
+            raw = self.git("cat-file", "commit", sha, binary=True)
+            self.assertEqual(commit["message"], raw.partition(b"\n\n")[2].decode())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from glitch import GlitchEngine
+
+# python -m unittest test_glitch
+
+FRAME = " ▄▄▄\n█ o █>\n ▀▀▀ duck\n"
+
+
+class GlitchEngineTest(unittest.TestCase):
+    def test_same_seed_same_banks(self):
+        a = GlitchEngine(seed=42)
+        b = GlitchEngine(seed=42)
+        for level in (25, 55, 80, 100):
+            self.assertEqual(a.bank(FRAME, level), b.bank(FRAME, level))
+        self.assertNotEqual(a.bank(FRAME, 100), (FRAME,) * a.variants)
+
+    def test_bucket_shares_a_bank(self):
+        engine = GlitchEngine(seed=1)
+        self.assertIs(engine.bank(FRAME, 81), engine.bank(FRAME, 89))
+        self.assertEqual(engine.bank(FRAME, 10), (FRAME,) * engine.variants)
+
+    def test_lru_eviction(self):
+        engine = GlitchEngine(max_banks=3, seed=7)
+        frames = [FRAME + str(i) for i in range(4)]
+        first = engine.bank(frames[0], 90)
+        for frame in frames[1:3]:
+            engine.bank(frame, 90)
+        engine.bank(frames[0], 90)          # now most recently used
+        engine.bank(frames[3], 90)          # evicts frames[1]
+        self.assertEqual(len(engine._banks), 3)
+        self.assertNotIn((frames[1], engine.bucket(90)), engine._banks)
+        self.assertIs(engine.bank(frames[0], 90), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
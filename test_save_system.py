@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import unittest
+
+from pet_system.pet_data import Pet
+from save_system import SAVE_VERSION, SaveStore, pet_from_save_data
+
+# python -m unittest test_save_system
+
+
+class SaveStoreTest(unittest.TestCase):
+    def setUp(self):
+        self._dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._dir.name, "pet.json")
+        self.journal = os.path.join(self._dir.name, "pet.journal")
+
+    def tearDown(self):
+        self._dir.cleanup()
+
+    def store(self, **kwargs):
+        return SaveStore(path=self.path, journal_path=self.journal, **kwargs)
+
+    def journal_lines(self):
+        with open(self.journal, 'rb') as f:
+            return f.read().splitlines(keepends=True)
+
+    def test_snapshot_and_journal_round_trip(self):
+        store = self.store()
+        pet = Pet(owner_name="Ada", pet_name="Quack")
+        store.save(pet, "hatch")
+        pet.feed(1000.0)
+        store.save(pet, "feed")
+        pet.play(2000.0)
+        pet.decay_memory(30)
+        store.save(pet, "play")
+        self.assertEqual(len(self.journal_lines()), 2)
+
+        save_data, meta = self.store().load_with_meta()
+        self.assertEqual(meta["journal_entries"], 2)
+        loaded = pet_from_save_data(save_data)
+        self.assertEqual(loaded.pet_name, "Quack")
+        self.assertEqual(dict(loaded.pet_memory), dict(pet.pet_memory))
+        self.assertEqual(dict(loaded.stats), dict(pet.stats))
+        self.assertEqual(dict(loaded.player_memory), dict(pet.player_memory))
+        self.assertEqual(loaded.interaction_times, [1000.0, 2000.0])
+
+    def test_torn_journal_tail(self):
+        store = self.store()
+        pet = Pet()
+        store.save(pet, "hatch")
+        pet.play(1000.0)
+        store.save(pet, "play")
+        with open(self.journal, 'ab') as f:
+            f.write(b'{"seq":3,"set":{"stats.happ')
+
+        # The torn entry is dropped and cut off, so later saves replay
+        store = self.store()
+        save_data = store.load()
+        self.assertEqual(save_data["pet_memory"]["interaction_count"], 1)
+        self.assertTrue(self.journal_lines()[-1].endswith(b'\n'))
+        pet = pet_from_save_data(save_data)
+        for t in (2000.0, 3000.0):
+            pet.play(t)
+            store.save(pet, "play")
+
+        save_data = self.store().load()
+        self.assertEqual(save_data["pet_memory"]["interaction_count"], 3)
+        self.assertEqual(save_data["interaction_times"], [1000.0, 2000.0, 3000.0])
+
+    def test_compaction(self):
+        store = self.store(compact_every=3)
+        pet = Pet()
+        store.save(pet, "hatch")
+        for t in range(1, 6):
+            pet.feed(float(t))
+            store.save(pet, "feed")
+        # Snapshots at hatch and at the 3rd feed; the 4th and 5th are journaled
+        self.assertEqual(len(self.journal_lines()), 2)
+        save_data, meta = self.store().load_with_meta()
+        self.assertEqual(meta["journal_entries"], 2)
+        self.assertEqual(save_data["interaction_times"], [1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(save_data["stats"], dict(pet.stats))
+
+    def test_migrate_v1(self):
+        v1 = {
+            "pet_name": "Old",
+            "creation_time": 100.0,
+            "pet_memory": {"owner_name": "Ada", "name_clarity": 80, "bond_level": 70,
+                           "learned_tricks": [], "interaction_count": 4},
+            "stats": {"health": 90, "happiness": 60, "hunger": 0, "age_hours": 0},
+            "player_memory": {"file_corruption": 5, "history_intact": True, "art_quality": 100},
+            "last_interaction": 200.0,
+            "last_commit": 150.0,
+            "last_save_time": 300.0,
+        }
+        with open(self.path, 'w') as f:
+            json.dump(v1, f)
+
+        store = self.store()
+        save_data, meta = store.load_with_meta()
+        self.assertEqual(meta["migrated_from"], 1)
+        self.assertEqual(save_data["version"], SAVE_VERSION)
+        self.assertEqual(save_data["interaction_times"], [])
+        self.assertEqual(save_data["decay_applied_until"], 300.0)
+
+        # The next save rewrites the snapshot in the current schema
+        store.save(pet_from_save_data(save_data), "load")
+        with open(self.path) as f:
+            self.assertEqual(json.load(f)["version"], SAVE_VERSION)
+
+
+if __name__ == "__main__":
+    unittest.main()